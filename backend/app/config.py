@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables from backend/.env
+load_dotenv(Path(__file__).resolve().parents[1] / '.env')
+
+# Bid engine: accepted bids are queued in Redis and written to Mongo in batches
+BID_PERSIST_BATCH_SIZE = int(os.getenv('BID_PERSIST_BATCH_SIZE', '500'))
+BID_PERSIST_INTERVAL = float(os.getenv('BID_PERSIST_INTERVAL', '0.05'))
+# Step by which proxy (maximum) bids outbid each other
+BID_INCREMENT = float(os.getenv('BID_INCREMENT', '1'))
+# How long hot auction state outlives its end_time if nobody closes it
+HOT_STATE_GRACE_SECONDS = int(os.getenv('HOT_STATE_GRACE_SECONDS', '3600'))
+
+# WebSocket fan-out: a send slower than this drops the socket
+WS_SEND_TIMEOUT = float(os.getenv('WS_SEND_TIMEOUT', '5'))
+# Per-socket outbound queue: once full, queued new_bid frames collapse into
+# the latest one, and a client that stays full this long is disconnected
+WS_QUEUE_SIZE = int(os.getenv('WS_QUEUE_SIZE', '64'))
+WS_SLOW_CONSUMER_SECONDS = float(os.getenv('WS_SLOW_CONSUMER_SECONDS', '10'))
+# Batch new_bid events into one bids_batch frame per auction per tick (0 disables)
+BROADCAST_TICK_MS = int(os.getenv('BROADCAST_TICK_MS', '0'))
+# Auction events are numbered and kept in a capped Redis stream so reconnecting
+# clients can resume; the stream expires this long after its last event
+EVENT_STREAM_MAXLEN = int(os.getenv('EVENT_STREAM_MAXLEN', '1000'))
+EVENT_STREAM_TTL = int(os.getenv('EVENT_STREAM_TTL', '86400'))
+# Recent bids included in the snapshot frame sent to clients that cannot resume
+WS_SNAPSHOT_BIDS = int(os.getenv('WS_SNAPSHOT_BIDS', '20'))
+# Auctions one multiplexed /ws socket may follow at once
+WS_MAX_SUBSCRIPTIONS = int(os.getenv('WS_MAX_SUBSCRIPTIONS', '100'))
+
+# Resolved users cached per process by get_current_user
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))
+
+# bcrypt thread pool: at most this many hashes run at once, and callers beyond
+# the queue limit or waiting longer than the timeout get a 503
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '100'))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))
+
+# Auction lifecycle scheduler: transitions due within the horizon are held in
+# memory, and Mongo is re-read this often to pick up new or edited auctions
+SCHEDULER_HORIZON_SECONDS = int(os.getenv('SCHEDULER_HORIZON_SECONDS', '3600'))
+SCHEDULER_RELOAD_SECONDS = float(os.getenv('SCHEDULER_RELOAD_SECONDS', '30'))
+SCHEDULER_LOCK_SECONDS = int(os.getenv('SCHEDULER_LOCK_SECONDS', '60'))
+
+# Auction detail and listing response cache (per-process LRU over Redis)
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '1000'))
+AUCTION_CACHE_TTL = int(os.getenv('AUCTION_CACHE_TTL', '30'))
+LISTING_CACHE_TTL = int(os.getenv('LISTING_CACHE_TTL', '5'))
+
+# Write-behind audit log sink: batches are flushed when full or after the
+# interval; when the queue is full, log() drops the entry ("drop", counted in
+# audit_log_dropped_total) or waits for room ("block", which stalls the bid
+# path for as long as Mongo is unavailable)
+AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', '0.2'))
+AUDIT_OVERFLOW_POLICY = os.getenv('AUDIT_OVERFLOW_POLICY', 'drop')
+# A batch that fails to insert is retried this many times in all, backing off
+# from AUDIT_RETRY_BACKOFF seconds (doubling, at most 30s), before it is given up
+AUDIT_RETRY_ATTEMPTS = int(os.getenv('AUDIT_RETRY_ATTEMPTS', '5'))
+AUDIT_RETRY_BACKOFF = float(os.getenv('AUDIT_RETRY_BACKOFF', '0.5'))
+
+# Documents fetched per cursor batch when streaming a bid export
+BID_EXPORT_BATCH_SIZE = int(os.getenv('BID_EXPORT_BATCH_SIZE', '1000'))
+
+# Admission control, as "tokens per second/burst" per bucket ("0" disables one)
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+BID_RATE_PER_USER = os.getenv('BID_RATE_PER_USER', '5/10')
+BID_RATE_PER_AUCTION = os.getenv('BID_RATE_PER_AUCTION', '200/400')
+BID_RATE_PER_IP = os.getenv('BID_RATE_PER_IP', '20/40')
+AUTH_RATE_PER_IP = os.getenv('AUTH_RATE_PER_IP', '1/10')
+# Load balancers and reverse proxies (addresses or CIDR ranges, comma
+# separated) whose X-Forwarded-For is believed when keying per-IP buckets;
+# without them every client behind the balancer shares one bucket
+TRUSTED_PROXIES = os.getenv('TRUSTED_PROXIES', '')
+# Buckets per limiter remembered as empty in-process, skipping Redis until they refill
+RATE_LIMIT_LOCAL_ENTRIES = int(os.getenv('RATE_LIMIT_LOCAL_ENTRIES', '10000'))
+
+# Idempotency-Key handling for bid placement: responses are kept for the TTL;
+# the lock bounds how long a crashed request holds its key, and duplicates
+# wait up to IDEMPOTENCY_WAIT_SECONDS for an in-flight original to finish
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '10'))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '5'))
+
+# Largest batch accepted by the bulk bid endpoint
+BULK_BID_MAX_ITEMS = int(os.getenv('BULK_BID_MAX_ITEMS', '1000'))
+
+# Per-auction running stats kept in Redis by the bid engine: the price series
+# is bucketed this many seconds wide, bids per minute is averaged over the
+# velocity window (a multiple of the bucket), frames carry the top leaders,
+# and the keys outlive the auction's end by STATS_TTL seconds
+STATS_BUCKET_SECONDS = int(os.getenv('STATS_BUCKET_SECONDS', '60'))
+STATS_VELOCITY_WINDOW = int(os.getenv('STATS_VELOCITY_WINDOW', '300'))
+STATS_FRAME_LEADERS = int(os.getenv('STATS_FRAME_LEADERS', '5'))
+STATS_TTL = int(os.getenv('STATS_TTL', str(7 * 24 * 3600)))
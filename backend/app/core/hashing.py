@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.config import PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_QUEUE_TIMEOUT, PASSWORD_HASH_WORKERS
+from app.core.metrics import PASSWORD_HASH_QUEUED, PASSWORD_HASH_SECONDS
+from app.core.utils import get_password_hash, verify_password
+
+
+# Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+# bcrypt releases the GIL while hashing, so threads give real parallelism.
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.queued = 0
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(workers)
+
+    async def hash(self, password: str) -> str:
+        with PASSWORD_HASH_SECONDS.labels("hash").time():
+            return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        with PASSWORD_HASH_SECONDS.labels("verify").time():
+            return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "in_flight": self.in_flight, "queued": self.queued}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, func, *args):
+        # Shed load instead of letting a login burst queue up without bound
+        if self.queued >= self.max_queue:
+            raise self._busy()
+        self.queued += 1
+        PASSWORD_HASH_QUEUED.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._busy()
+        finally:
+            self.queued -= 1
+            PASSWORD_HASH_QUEUED.dec()
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_QUEUE_TIMEOUT)
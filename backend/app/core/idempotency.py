@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response
+
+from app.config import IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL, IDEMPOTENCY_WAIT_SECONDS
+from app.core.serialization import dumps
+from app.db import redis_client
+
+MAX_KEY_LENGTH = 255
+
+# How often a duplicate waiting on an in-flight request checks for its result
+POLL_INTERVAL = 0.05
+
+# Drop a pending marker only if it is still ours; after the lock expired
+# another request may have claimed the key
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fingerprint(*parts: str) -> str:
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+# Each key holds "fingerprint|pending|token" while the first request runs
+# (taken with SET NX), then "fingerprint|status|body" once it has an answer.
+# The fingerprint catches a key reused for a different request.
+class IdempotencyStore:
+    def __init__(self):
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+
+    async def run(self, scope: str, key: str, request_fingerprint: str,
+                  handler: Callable[[], Awaitable[dict]],
+                  admit: Optional[Callable[[], Awaitable[None]]] = None) -> Response:
+        """Run ``handler()`` at most once per key; repeats get the stored response.
+
+        A duplicate arriving while the first request is still running waits for
+        its result, up to IDEMPOTENCY_WAIT_SECONDS. ``admit()`` (admission
+        control) is awaited only by a request about to run the handler, so
+        replays are answered from the one lookup and never spend rate tokens.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+        redis_key = f'idempotency:{scope}:{key}'
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+
+        stored = await redis_client.get(redis_key)
+        while True:
+            if stored is None:
+                # First to arrive, or the earlier attempt failed and let go of the key
+                if admit is not None:
+                    await admit()
+                    admit = None
+                marker = f'{request_fingerprint}|pending|{uuid.uuid4().hex}'
+                if await redis_client.set(redis_key, marker, nx=True, ex=IDEMPOTENCY_LOCK_SECONDS):
+                    return await self._execute(redis_key, marker, request_fingerprint, handler)
+            else:
+                stored_fingerprint, status_code, body = stored.split('|', 2)
+                if stored_fingerprint != request_fingerprint:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used for a different request"
+                    )
+                if status_code != 'pending':
+                    return Response(
+                        content=body,
+                        status_code=int(status_code),
+                        media_type="application/json",
+                        headers={"Idempotent-Replayed": "true"}
+                    )
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"}
+                )
+            await asyncio.sleep(POLL_INTERVAL)
+            stored = await redis_client.get(redis_key)
+
+    async def _execute(self, redis_key: str, marker: str, request_fingerprint: str, handler) -> Response:
+        try:
+            result = await handler()
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                await self._release(keys=[redis_key], args=[marker])
+                raise
+            # A rejection is an answer too; retrying the same request gets it again
+            await self._store(redis_key, request_fingerprint, exc.status_code, dumps({"detail": exc.detail}))
+            raise
+        except BaseException:
+            await self._release(keys=[redis_key], args=[marker])
+            raise
+
+        body = dumps(result)
+        await self._store(redis_key, request_fingerprint, 200, body)
+        return Response(content=body, media_type="application/json")
+
+    async def _store(self, redis_key: str, request_fingerprint: str, status_code: int, body: bytes):
+        await redis_client.set(redis_key, f'{request_fingerprint}|{status_code}|{body.decode()}', ex=IDEMPOTENCY_TTL)
+
+
+idempotency = IdempotencyStore()
@@ -0,0 +1,149 @@
+import time
+from typing import Callable
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from fastapi import Request, Response
+
+# Buckets for the sub-second operations on the bid path
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency",
+    ["collection", "command", "outcome"],
+    buckets=FAST_BUCKETS
+)
+REDIS_PUBLISH_SECONDS = Histogram(
+    "redis_publish_duration_seconds",
+    "Time to publish an auction event to Redis, including cache invalidation hooks",
+    buckets=FAST_BUCKETS
+)
+WS_FANOUT_SECONDS = Histogram(
+    "websocket_fanout_duration_seconds",
+    "Time to hand one auction event to every local socket queue",
+    buckets=FAST_BUCKETS
+)
+WS_SEND_SECONDS = Histogram(
+    "websocket_send_duration_seconds",
+    "Time to write one frame to one socket",
+    buckets=FAST_BUCKETS
+)
+WS_SLOW_CONSUMERS = Counter(
+    "websocket_slow_consumers_total",
+    "Sockets dropped for falling too far behind"
+)
+BID_RESULTS = Counter(
+    "bids_total",
+    "Bid attempts by outcome (accepted, or the rejection reason)",
+    ["outcome"]
+)
+RATE_LIMITED = Counter(
+    "rate_limited_total",
+    "Requests rejected with 429, by limiter and the bucket that ran dry",
+    ["limiter", "scope"]
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify latency, including time waiting for a worker",
+    ["operation"]
+)
+PASSWORD_HASH_QUEUED = Gauge(
+    "password_hash_queued",
+    "Password hash calls waiting for a worker"
+)
+
+
+async def track_request_latency(request: Request, call_next):
+    """HTTP middleware: time each request, labelled by its route template."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The template keeps one series per route rather than one per auction id
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status)
+        ).observe(time.perf_counter() - started)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command, labelled by collection and command name."""
+
+    def __init__(self):
+        # request_id -> collection, filled in when a command starts
+        self._collections: dict = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        self._collections[event.request_id] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        self._observe(event, "success")
+
+    def failed(self, event):
+        self._observe(event, "failure")
+
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_SECONDS.labels(collection, event.command_name, outcome).observe(event.duration_micros / 1e6)
+
+
+class _WebSocketCollector:
+    def __init__(self, connection_counts: Callable[[], dict]):
+        self._connection_counts = connection_counts
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "websocket_connections",
+            "Open WebSocket connections on this worker, per auction",
+            labels=["auction_id"]
+        )
+        for auction_id, count in self._connection_counts().items():
+            gauge.add_metric([auction_id], count)
+        yield gauge
+
+
+def register_websocket_gauge(connection_counts: Callable[[], dict]):
+    """Expose per-auction socket counts, read from ``connection_counts()`` at scrape time."""
+    REGISTRY.register(_WebSocketCollector(connection_counts))
+
+
+class _StatsCollector:
+    def __init__(self, prefix: str, description: str, stats: Callable[[], dict], counters: tuple):
+        self._prefix = prefix
+        self._description = description
+        self._stats = stats
+        self._counters = counters
+
+    def collect(self):
+        for key, value in self._stats().items():
+            name = f"{self._prefix}_{key}"
+            documentation = f"{self._description}: {key.replace('_', ' ')}"
+            if key in self._counters:
+                yield CounterMetricFamily(name, documentation, value=value)
+            else:
+                yield GaugeMetricFamily(name, documentation, value=value)
+
+
+def register_stats(prefix: str, description: str, stats: Callable[[], dict], counters: tuple = ()):
+    """Expose each numeric field of ``stats()`` as ``<prefix>_<field>``, read at scrape time.
+
+    Fields named in ``counters`` only ever grow and are exported as counters.
+    """
+    REGISTRY.register(_StatsCollector(prefix, description, stats, counters))
@@ -0,0 +1,197 @@
+import ipaddress
+import logging
+import math
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwt
+
+from app.config import (
+    AUTH_RATE_PER_IP,
+    BID_RATE_PER_AUCTION,
+    BID_RATE_PER_IP,
+    BID_RATE_PER_USER,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_LOCAL_ENTRIES,
+    TRUSTED_PROXIES,
+)
+from app.core.metrics import RATE_LIMITED
+from app.core.utils import ALGORITHM, SECRET_KEY
+from app.db import redis_client
+
+logger = logging.getLogger(__name__)
+
+USER = "user"
+AUCTION = "auction"
+IP = "ip"
+
+# Refill and take one token from every bucket, or from none of them.
+# KEYS: bucket hashes; ARGV: rate (tokens/second) and burst for each key, in
+# order. Returns {1} when admitted, else {0, ms until a token is free, index of
+# the bucket that ran dry}. Redis' clock is used so every worker agrees.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local levels = {}
+local wait, blocked = 0, 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local burst = tonumber(ARGV[i * 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+    tokens = math.min(burst, tokens + elapsed * rate / 1000)
+    levels[i] = tokens
+    if tokens < 1 then
+        local needed = math.ceil((1 - tokens) * 1000 / rate)
+        if needed > wait then
+            wait, blocked = needed, i
+        end
+    end
+end
+if blocked > 0 then
+    return {0, wait, blocked}
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local burst = tonumber(ARGV[i * 2])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(burst * 1000 / rate) + 1000)
+end
+return {1}
+"""
+
+
+def parse_rate(spec: str) -> Optional[tuple]:
+    """'rate/burst' -> (tokens per second, bucket size); '' or '0' disables the bucket."""
+    if not spec or spec == '0':
+        return None
+    rate, _, burst = spec.partition('/')
+    rate = float(rate)
+    return rate, float(burst) if burst else max(1.0, rate)
+
+
+def parse_networks(spec: str) -> list:
+    """'10.0.0.0/8,192.168.1.5' -> networks; bare addresses become single-host networks."""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(',') if part.strip()]
+
+
+_trusted_proxies = parse_networks(TRUSTED_PROXIES)
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """The caller's address, looking through X-Forwarded-For set by trusted proxies.
+
+    Hops are read right to left and the first one not in TRUSTED_PROXIES is the
+    client; entries further left were supplied by the client and are ignored.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def token_subject(request: Request) -> Optional[str]:
+    """The user id of a validly signed bearer token, or None. Never touches the database."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+# Admission control as a FastAPI dependency: token buckets in Redis, checked
+# before any database work, with rejections remembered locally so a client
+# hammering a full bucket is turned away without a Redis round trip
+class RateLimiter:
+    def __init__(self, name: str, per_user: Optional[str] = None, per_auction: Optional[str] = None,
+                 per_ip: Optional[str] = None):
+        self.name = name
+        self.limits = {
+            scope: rate
+            for scope, rate in ((USER, parse_rate(per_user)), (AUCTION, parse_rate(per_auction)), (IP, parse_rate(per_ip)))
+            if rate is not None
+        }
+        # bucket key -> monotonic time until which it is known to be empty
+        self._blocked: dict = {}
+        self._take = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED or not self.limits:
+            return
+
+        buckets = []
+        for scope, (rate, burst) in self.limits.items():
+            subject = self._subject(scope, request)
+            if subject is not None:
+                buckets.append((scope, f'ratelimit:{self.name}:{scope}:{subject}', rate, burst))
+        if not buckets:
+            return
+
+        now = time.monotonic()
+        for scope, key, _, _ in buckets:
+            until = self._blocked.get(key)
+            if until is not None:
+                if until > now:
+                    raise self._reject(scope, until - now)
+                del self._blocked[key]
+
+        args = []
+        for _, _, rate, burst in buckets:
+            args += [rate, burst]
+        try:
+            result = await self._take(keys=[key for _, key, _, _ in buckets], args=args)
+        except Exception:
+            # Fail open: an unavailable limiter must not take the API down with it
+            logger.warning("Rate limiter %s unavailable, admitting request", self.name, exc_info=True)
+            return
+        if result[0] == 1:
+            return
+
+        retry_after = int(result[1]) / 1000
+        scope, key, _, _ = buckets[int(result[2]) - 1]
+        self._remember(key, now + retry_after)
+        raise self._reject(scope, retry_after)
+
+    @staticmethod
+    def _subject(scope: str, request: Request) -> Optional[str]:
+        if scope == USER:
+            return token_subject(request)
+        if scope == AUCTION:
+            return request.path_params.get("auction_id")
+        return client_ip(request)
+
+    def _remember(self, key: str, until: float):
+        if len(self._blocked) >= RATE_LIMIT_LOCAL_ENTRIES:
+            now = time.monotonic()
+            self._blocked = {k: v for k, v in self._blocked.items() if v > now}
+            if len(self._blocked) >= RATE_LIMIT_LOCAL_ENTRIES:
+                return
+        self._blocked[key] = until
+
+    def _reject(self, scope: str, retry_after: float) -> HTTPException:
+        RATE_LIMITED.labels(self.name, scope).inc()
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+bid_rate_limit = RateLimiter("bid", per_user=BID_RATE_PER_USER, per_auction=BID_RATE_PER_AUCTION, per_ip=BID_RATE_PER_IP)
+auth_rate_limit = RateLimiter("auth", per_ip=AUTH_RATE_PER_IP)
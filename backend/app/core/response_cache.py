@@ -0,0 +1,234 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+from fastapi import Request, Response
+
+from app.config import AUCTION_CACHE_TTL, LISTING_CACHE_TTL, RESPONSE_CACHE_SIZE
+from app.core.metrics import register_stats
+from app.core.serialization import dumps
+from app.db import redis_client
+from app.manager.connection_manager import event_seq_key
+
+# Listing pages in Redis live under the current generation; bumping it
+# retires every cached page at once
+LISTING_GENERATION_KEY = 'cache:auctions:gen'
+
+# Event types that only move the price; anything else may change status
+BID_EVENT_TYPES = {"new_bid", "bids_batch"}
+
+# Listing fields a bid event carries the new value for
+BID_PATCH_FIELDS = ("current_highest_bid", "total_bids")
+
+# Store a freshly built detail body only if no event was published since its
+# build started. KEYS: detail key, the auction's event seq; ARGV: seq read
+# before the build, packed entry, TTL. Publishing bumps the seq and deletes the
+# detail key in one MULTI, so an entry in Redis always matches the current seq.
+STORE_DETAIL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Per-auction event marks kept for the local layer before starting over
+MAX_EVENT_MARKS_FACTOR = 10
+
+
+def _detail_key(auction_id: str) -> str:
+    return f'cache:auction:{auction_id}'
+
+
+def _listing_key(generation: str, query_key: str) -> str:
+    return f'cache:auctions:{generation}:{query_key}'
+
+
+class CachedResponse:
+    """A serialized JSON body with its ETag and extra response headers."""
+
+    def __init__(self, body: bytes, headers: dict, ttl: float, data=None, seq: Optional[int] = None):
+        self.body = body
+        self.headers = headers
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.expires = time.monotonic() + ttl
+        self._data = data
+        # The auction event seq this body reflects (detail entries only)
+        self.seq = seq
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = orjson.loads(self.body)
+        return self._data
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+    def pack(self) -> bytes:
+        # orjson never emits a raw newline, so it safely separates headers from body
+        return orjson.dumps(self.headers) + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, packed: str, ttl: float) -> "CachedResponse":
+        headers, body = packed.encode().split(b"\n", 1)
+        return cls(body, orjson.loads(headers), ttl)
+
+
+# Two-level read-through cache for auction detail and listing responses:
+# a per-process LRU in front of Redis, kept fresh by auction events
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._details: OrderedDict = OrderedDict()
+        self._listings: OrderedDict = OrderedDict()
+        self._store_detail = redis_client.register_script(STORE_DETAIL_SCRIPT)
+        # Events applied by on_event, and per auction the count at its latest
+        # one, so a body fetched before an event is not cached after it
+        self._events = 0
+        self._event_marks: dict = {}
+        self._event_floor = 0
+        self._listing_resets = 0
+
+    async def detail(self, auction_id: str, build, min_seq: Optional[int] = None) -> Optional[CachedResponse]:
+        """Cached detail body for an auction; ``build()`` returns the data on a miss.
+
+        With ``min_seq``, a local entry older than that event is skipped.
+        """
+        entry = self._get_local(self._details, auction_id)
+        if entry is not None and (min_seq is None or entry.seq >= min_seq):
+            return entry
+
+        mark = self._events
+        key = _detail_key(auction_id)
+        packed, seq = await redis_client.mget(key, event_seq_key(auction_id))
+        seq = int(seq or 0)
+        if packed is not None:
+            self.hits += 1
+            entry = CachedResponse.unpack(packed, AUCTION_CACHE_TTL)
+            entry.seq = seq
+        else:
+            self.misses += 1
+            data = await build()
+            if data is None:
+                return None
+            entry = CachedResponse(dumps(data), {}, AUCTION_CACHE_TTL, data, seq)
+            # A bid landing mid-build already deleted the key; writing this
+            # body back would serve the old price until the TTL ran out
+            if not await self._store_detail(keys=[key, event_seq_key(auction_id)],
+                                            args=[seq, entry.pack(), AUCTION_CACHE_TTL]):
+                return entry
+        if not self._changed_since(auction_id, mark):
+            self._put_local(self._details, auction_id, entry)
+        return entry
+
+    async def listing(self, query_key: str, build, refresh) -> CachedResponse:
+        """Cached listing page; ``build()`` returns ``(rows, headers)`` on a miss.
+
+        Bid events do not retire shared pages, so ``refresh(rows)`` brings the
+        bid fields of rows fetched from Redis or Mongo up to date before they
+        are served or kept locally.
+        """
+        entry = self._get_local(self._listings, query_key)
+        if entry is not None:
+            return entry
+
+        mark, resets = self._events, self._listing_resets
+        generation = await redis_client.get(LISTING_GENERATION_KEY) or '0'
+        key = _listing_key(generation, query_key)
+        packed = await redis_client.get(key)
+        if packed is not None:
+            self.hits += 1
+            entry = CachedResponse.unpack(packed, LISTING_CACHE_TTL)
+            rows, headers = entry.data, entry.headers
+        else:
+            self.misses += 1
+            rows, headers = await build()
+        rows = await refresh(rows)
+        entry = CachedResponse(dumps(rows), headers, LISTING_CACHE_TTL, rows)
+        if packed is None:
+            await redis_client.set(key, entry.pack(), ex=LISTING_CACHE_TTL)
+        # An event that arrived meanwhile may not be reflected in these rows
+        if resets == self._listing_resets and not any(self._changed_since(row["id"], mark) for row in rows):
+            self._put_local(self._listings, query_key, entry)
+        return entry
+
+    def on_publish(self, pipe, auction_id: str, message: dict):
+        """Queue the Redis-side invalidation alongside an auction event's publish."""
+        pipe.delete(_detail_key(auction_id))
+        if message.get("type") not in BID_EVENT_TYPES:
+            # A price change is applied to shared pages by refresh() on read;
+            # only a new auction or a status change can move rows between pages
+            pipe.incr(LISTING_GENERATION_KEY)
+
+    def on_event(self, auction_id: str, message: dict):
+        """Apply an auction event received by this worker to the local layer."""
+        self._details.pop(auction_id, None)
+        self._events += 1
+        if len(self._event_marks) >= self.max_entries * MAX_EVENT_MARKS_FACTOR:
+            # Forgotten auctions count as changed at this point
+            self._event_marks.clear()
+            self._event_floor = self._events
+        self._event_marks[auction_id] = self._events
+        if message.get("type") not in BID_EVENT_TYPES:
+            # Status may have changed, so any page could gain or lose rows
+            self._listings.clear()
+            self._listing_resets += 1
+            return
+
+        state = message["auction"]
+        for query_key, entry in list(self._listings.items()):
+            rows = entry.data
+            if not any(row["id"] == auction_id for row in rows):
+                continue
+            if "sort=price" in query_key:
+                # The new price may move the row to another page
+                del self._listings[query_key]
+                continue
+            for row in rows:
+                if row["id"] == auction_id:
+                    for field in BID_PATCH_FIELDS:
+                        row[field] = state[field]
+                    row["current_price"] = state["current_highest_bid"]
+            patched = CachedResponse(dumps(rows), entry.headers, 0, rows)
+            patched.expires = entry.expires
+            self._listings[query_key] = patched
+
+    def stats(self) -> dict:
+        return {
+            "details": len(self._details),
+            "listings": len(self._listings),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _changed_since(self, auction_id: str, mark: int) -> bool:
+        return self._event_marks.get(auction_id, self._event_floor) > mark
+
+    def _get_local(self, entries: OrderedDict, key: str) -> Optional[CachedResponse]:
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires < time.monotonic():
+            del entries[key]
+            return None
+        entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _put_local(self, entries: OrderedDict, key: str, entry: CachedResponse):
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+register_stats("response_cache", "Auction response cache", response_cache.stats, counters=("hits", "misses"))
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional, Type
+
+import orjson
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+# UTC datetimes end in "Z", exactly as Pydantic's JSON mode writes them
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+_FLOAT_ANNOTATIONS = (float, Optional[float])
+
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data, option=JSON_OPTIONS)
+
+
+def csv_value(value) -> str:
+    """A scalar spelled as ``dumps`` spells it, minus JSON quoting: "Z" datetimes, lowercase booleans."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    encoded = orjson.dumps(value, option=JSON_OPTIONS).decode()
+    return encoded[1:-1] if isinstance(value, datetime) else encoded
+
+
+class RowShaper:
+    """Trims a stored document to a model's fields without validating it.
+
+    For rows this app wrote itself and already validated on the way in. Output
+    matches ``Model(**doc).model_dump()`` for such rows: unknown fields are
+    dropped, missing ones get their defaults, and whole-number floats stay
+    floats. Build one per model up front and reuse it.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self._fields = []
+        for name, field in model.model_fields.items():
+            is_factory = field.default_factory is not None
+            if is_factory:
+                default = field.default_factory
+            else:
+                default = None if field.default is PydanticUndefined else field.default
+            self._fields.append((name, default, is_factory, field.annotation in _FLOAT_ANNOTATIONS))
+
+    def __call__(self, doc: dict) -> dict:
+        row = {}
+        for name, default, is_factory, is_float in self._fields:
+            if name in doc:
+                value = doc[name]
+                if is_float and type(value) is int:
+                    value = float(value)
+            else:
+                value = default() if is_factory else default
+            row[name] = value
+        return row
+
+    def many(self, docs: list) -> list:
+        return [self(doc) for doc in docs]
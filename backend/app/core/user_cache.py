@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import USER_CACHE_SIZE, USER_CACHE_TTL
+from app.core.metrics import register_stats
+from app.db import redis_client
+from app.models.user import User
+
+# Published with a user id whenever a user record changes
+USER_INVALIDATION_CHANNEL = 'users:invalidate'
+
+
+# In-process TTL/LRU cache of resolved users, keyed by user id
+class UserCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: User):
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+register_stats("user_cache", "Resolved user cache", user_cache.stats, counters=("hits", "misses"))
+
+
+async def invalidate_users(user_ids: list):
+    """Drop changed users from this process's cache and tell every other worker, in one round trip."""
+    for user_id in user_ids:
+        user_cache.invalidate(user_id)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            pipe.publish(USER_INVALIDATION_CHANNEL, user_id)
+        await pipe.execute()
@@ -1,9 +1,13 @@
 from datetime import datetime, timedelta, timezone
+import base64
 import os
+from typing import Optional
+import orjson
 from passlib.context import CryptContext
 from app.db import db
 from app.models.auction import AuctionStatus
-from app.models.user import User
+from app.core.user_cache import user_cache
+from app.models.user import TokenUser, User
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
@@ -28,25 +32,52 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    credentials_exception = HTTPException(
+def create_user_token(user: User) -> str:
+    # name and is_admin ride along as signed claims so hot paths can skip the user lookup
+    return create_access_token(data={"sub": user.id, "name": user.name, "is_admin": user.is_admin})
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(credentials: HTTPAuthorizationCredentials) -> dict:
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
-    
+        raise credentials_exception()
+    if payload.get("sub") is None:
+        raise credentials_exception()
+    return payload
+
+async def resolve_user(user_id: str) -> User:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
     user = await db.users.find_one({"id": user_id}, {"_id": 0})
     if user is None:
-        raise credentials_exception
-    return User(**user)
+        raise credentials_exception()
+    user = User(**user)
+    user_cache.put(user)
+    return user
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    payload = decode_token(credentials)
+    return await resolve_user(payload["sub"])
+
+async def get_token_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenUser:
+    """The caller as described by the token's claims, without a database lookup.
+
+    Tokens issued before the claims were added fall back to get_current_user.
+    """
+    payload = decode_token(credentials)
+    if "name" in payload and "is_admin" in payload:
+        return TokenUser(id=payload["sub"], name=payload["name"], is_admin=payload["is_admin"])
+    user = await resolve_user(payload["sub"])
+    return TokenUser(id=user.id, name=user.name, is_admin=user.is_admin)
 
 def get_auction_status(start_time: datetime, end_time: datetime) -> str:
     now = datetime.now(timezone.utc)
@@ -55,4 +86,48 @@ def get_auction_status(start_time: datetime, end_time: datetime) -> str:
     elif now > end_time:
         return AuctionStatus.COMPLETED
     else:
-        return AuctionStatus.ONGOING
\ No newline at end of file
+        return AuctionStatus.ONGOING
+
+def get_status_query(status: str, now: datetime) -> dict:
+    """Mongo filter matching the auctions get_auction_status would give ``status``."""
+    if status == AuctionStatus.UPCOMING:
+        return {"start_time": {"$gt": now}}
+    if status == AuctionStatus.COMPLETED:
+        return {"end_time": {"$lt": now}}
+    if status == AuctionStatus.ONGOING:
+        return {"start_time": {"$lte": now}, "end_time": {"$gte": now}}
+    raise HTTPException(status_code=400, detail="Invalid status")
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, orjson.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # The values end up in a Mongo filter; an object here would be read as operators
+    if not isinstance(values, list) or len(values) != 2 or not isinstance(values[1], str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def cursor_datetime(value) -> datetime:
+    """A timestamp taken from a decoded cursor; anything else is a bad cursor, not a 500."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def cursor_number(value) -> Optional[float]:
+    """A price taken from a decoded cursor; null is kept, as rows without a price sort first."""
+    if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_query(field: str, direction: int, value, last_id: str) -> dict:
+    """Filter for the rows after (value, last_id) in a (field, id) ordering."""
+    op = "$gt" if direction == 1 else "$lt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "id": {op: last_id}}
+    ]}
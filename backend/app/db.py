@@ -4,13 +4,18 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from pymongo.errors import BulkWriteError
+
+from app.core.metrics import MongoCommandMetrics
+
 # Load environment variables from backend/.env
 load_dotenv(Path(__file__).resolve().parents[1] / '.env')
 
 # MongoDB connection
 mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
 db_name = os.getenv('DB_NAME', 'auction_db')
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware so stored datetimes come back as UTC-aware values
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=[MongoCommandMetrics()])
 db = client[db_name]
 
 # Redis connection for pub/sub
@@ -18,4 +23,41 @@ redis_client = redis.Redis(
     host=os.getenv('REDIS_HOST', 'localhost'),
     port=int(os.getenv('REDIS_PORT', '6379')),
     decode_responses=True
-)
\ No newline at end of file
+)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+async def insert_new(collection, documents: list):
+    """insert_many that skips documents already written by an earlier attempt."""
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if e.details.get('writeConcernErrors') or any(
+            error['code'] != DUPLICATE_KEY_ERROR for error in e.details['writeErrors']
+        ):
+            raise
+
+
+async def ensure_indexes():
+    """Create the indexes the query paths rely on. Safe to run on every startup."""
+    await db.auctions.create_index("id", unique=True)
+    await db.bids.create_index("id", unique=True)
+    # Bid history pages on (created_at, id) newest first and exports walk it
+    # oldest first; both are served by one index, without an in-memory sort
+    await db.bids.create_index([("auction_id", 1), ("created_at", -1), ("id", -1)])
+    await db.users.create_index("id", unique=True)
+    await db.users.create_index("email", unique=True)
+    await db.audit_logs.create_index([("auction_id", 1), ("timestamp", 1)])
+
+    # Catalog listing: status filters are ranges on start/end time, and each
+    # sort order pages on (sort key, id)
+    await db.auctions.create_index([("start_time", 1), ("end_time", 1)])
+    await db.auctions.create_index([("end_time", 1), ("id", 1)])
+    await db.auctions.create_index([("start_time", -1), ("id", -1)])
+    await db.auctions.create_index([("current_price", 1), ("id", 1)])
+
+    # Lifecycle scheduler: pending transitions by stored status and due time
+    await db.auctions.create_index([("status", 1), ("start_time", 1)])
+    await db.auctions.create_index([("status", 1), ("end_time", 1)])
+    await db.settlements.create_index("auction_id", unique=True)
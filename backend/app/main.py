@@ -12,7 +12,15 @@ from dotenv import load_dotenv
 import os
 import logging
 import redis.asyncio as redis
-from app.db import client as mongo_client, redis_client
+from app.db import client as mongo_client, ensure_indexes, redis_client
+from app.core.hashing import password_hasher
+from app.core.metrics import metrics_response, track_request_latency
+from app.core.response_cache import response_cache
+from app.core.user_cache import USER_INVALIDATION_CHANNEL, user_cache
+from app.manager.audit_writer import audit_writer
+from app.manager.auction_scheduler import auction_scheduler
+from app.manager.bid_engine import bid_engine
+from app.manager.connection_manager import manager
 from app.routes import websocket, auction as auction_routes, auth as auth_routes
 
 ROOT_DIR = Path(__file__).parent
@@ -41,12 +49,19 @@ app.include_router(auth_routes.api_router, prefix="/api")
 
 app.include_router(api_router)
 
+app.middleware("http")(track_request_latency)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 logging.basicConfig(
@@ -55,7 +70,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_background_services():
+    await ensure_indexes()
+    await audit_writer.start()
+    await bid_engine.start()
+    manager.add_channel_handler(USER_INVALIDATION_CHANNEL, user_cache.invalidate)
+    manager.add_publish_hook(response_cache.on_publish)
+    manager.add_event_handler(response_cache.on_event)
+    await manager.start()
+    await auction_scheduler.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await auction_scheduler.stop()
+    await manager.stop()
+    await bid_engine.stop()
+    password_hasher.shutdown()
+    await audit_writer.stop()
     mongo_client.close()
     await redis_client.close()
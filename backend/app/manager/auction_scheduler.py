@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import SCHEDULER_HORIZON_SECONDS, SCHEDULER_LOCK_SECONDS, SCHEDULER_RELOAD_SECONDS
+from app.db import db, redis_client
+from app.manager.audit_writer import audit_writer
+from app.manager.bid_engine import bid_engine
+from app.manager.connection_manager import manager
+from app.models.auction import AuctionStatus
+from app.models.settlement import Settlement
+
+logger = logging.getLogger(__name__)
+
+START = "start"
+END = "end"
+
+
+# Fires auction start/end transitions at their scheduled times
+class AuctionScheduler:
+    def __init__(self):
+        # (due timestamp, auction_id, transition), soonest first
+        self._heap: list = []
+        self._scheduled: set = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._next_reload = 0.0
+
+    async def start(self):
+        if self._task is None:
+            self._changed = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, auction: dict):
+        """Queue the pending transitions of a single auction, e.g. right after it is created."""
+        horizon = time.time() + SCHEDULER_HORIZON_SECONDS
+        status = auction.get('status')
+        if status == AuctionStatus.UPCOMING:
+            self._push(auction['start_time'].timestamp(), auction['id'], START, horizon)
+        if status != AuctionStatus.COMPLETED:
+            self._push(auction['end_time'].timestamp(), auction['id'], END, horizon)
+
+    def _push(self, due: float, auction_id: str, transition: str, horizon: float):
+        if due > horizon or (auction_id, transition) in self._scheduled:
+            return
+        self._scheduled.add((auction_id, transition))
+        heapq.heappush(self._heap, (due, auction_id, transition))
+        if self._changed is not None:
+            self._changed.set()
+
+    async def _reload(self):
+        """Load every transition that is overdue or due within the horizon."""
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=SCHEDULER_HORIZON_SECONDS)
+        cursor = db.auctions.find(
+            {"$or": [
+                {"status": AuctionStatus.UPCOMING, "start_time": {"$lte": horizon}},
+                {"status": {"$ne": AuctionStatus.COMPLETED}, "end_time": {"$lte": horizon}},
+            ]},
+            {"_id": 0, "id": 1, "status": 1, "start_time": 1, "end_time": 1}
+        )
+        async for auction in cursor:
+            self.schedule(auction)
+
+    async def _run(self):
+        while True:
+            try:
+                now = time.time()
+                if now >= self._next_reload:
+                    await self._reload()
+                    self._next_reload = now + SCHEDULER_RELOAD_SECONDS
+
+                due = []
+                while self._heap and self._heap[0][0] <= time.time():
+                    _, auction_id, transition = heapq.heappop(self._heap)
+                    self._scheduled.discard((auction_id, transition))
+                    due.append((auction_id, transition))
+                if due:
+                    await asyncio.gather(*[self._transition(*item) for item in due])
+
+                wake_at = self._next_reload
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), max(0.0, wake_at - time.time()))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Auction scheduler iteration failed")
+                await asyncio.sleep(1)
+
+    async def _transition(self, auction_id: str, transition: str):
+        # Every worker schedules the same transitions; only the lock holder acts
+        lock_key = f'lock:auction:{auction_id}:{transition}'
+        if not await redis_client.set(lock_key, '1', nx=True, ex=SCHEDULER_LOCK_SECONDS):
+            return
+        try:
+            if transition == START:
+                await self._open(auction_id)
+            else:
+                await self._close(auction_id)
+        except Exception:
+            logger.exception("Failed to %s auction %s", transition, auction_id)
+            await redis_client.delete(lock_key)
+
+    async def _open(self, auction_id: str):
+        # An auction that was never opened and is already over only gets closed
+        result = await db.auctions.update_one(
+            {"id": auction_id, "status": AuctionStatus.UPCOMING, "end_time": {"$gt": datetime.now(timezone.utc)}},
+            {"$set": {"status": AuctionStatus.ONGOING}}
+        )
+        if not result.modified_count:
+            return
+        await bid_engine.warm(auction_id)
+        await manager.broadcast_to_auction(auction_id, {
+            "type": "auction_started",
+            "auction_id": auction_id,
+            "status": AuctionStatus.ONGOING
+        })
+
+    async def _close(self, auction_id: str):
+        # Stop bidding first; the state it closed on is final, even if queued
+        # bids have not reached Mongo yet
+        final = await bid_engine.close_auction(auction_id)
+        auction = await db.auctions.find_one(
+            {"id": auction_id, "status": {"$ne": AuctionStatus.COMPLETED}},
+            {"_id": 0}
+        )
+        if auction is None:
+            return
+        if final is not None:
+            auction.update(final)
+
+        # Settle before flipping the status, so a failure in between is retried
+        settlement = Settlement(
+            id=str(uuid.uuid4()),
+            auction_id=auction_id,
+            winner_id=auction.get('current_highest_bidder_id'),
+            winner_name=auction.get('current_highest_bidder_name'),
+            final_price=auction.get('current_highest_bid'),
+            total_bids=auction.get('total_bids', 0)
+        )
+        await db.settlements.update_one(
+            {"auction_id": auction_id},
+            {"$setOnInsert": settlement.model_dump()},
+            upsert=True
+        )
+        result = await db.auctions.update_one(
+            {"id": auction_id, "status": {"$ne": AuctionStatus.COMPLETED}},
+            {"$set": {"status": AuctionStatus.COMPLETED}}
+        )
+        if not result.modified_count:
+            return
+        if settlement.winner_id:
+            await audit_writer.log(
+                auction_id,
+                settlement.winner_id,
+                f"Auction won by {settlement.winner_name} at ${settlement.final_price}"
+            )
+        await manager.broadcast_to_auction(auction_id, {
+            "type": "auction_closed",
+            "auction_id": auction_id,
+            "status": AuctionStatus.COMPLETED,
+            "winner_name": settlement.winner_name,
+            "final_price": settlement.final_price,
+            "total_bids": settlement.total_bids
+        })
+
+
+auction_scheduler = AuctionScheduler()
@@ -0,0 +1,132 @@
+import json
+import math
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import STATS_BUCKET_SECONDS, STATS_VELOCITY_WINDOW
+from app.db import redis_client
+
+
+def _leaders_key(auction_id: str) -> str:
+    # user_id -> that bidder's highest bid
+    return f'auction:{auction_id}:leaders'
+
+
+def _names_key(auction_id: str) -> str:
+    # user_id -> display name, for the leaderboard
+    return f'auction:{auction_id}:names'
+
+
+def _bidders_key(auction_id: str) -> str:
+    # HyperLogLog of user_ids that have bid
+    return f'auction:{auction_id}:bidders'
+
+
+def _series_key(auction_id: str) -> str:
+    # "<bucket start>:n" -> bids in the bucket, "<bucket start>:p" -> closing price
+    return f'auction:{auction_id}:series'
+
+
+def stats_keys(auction_id: str) -> list:
+    """The stats keys, in the order the Lua functions below take them."""
+    return [_leaders_key(auction_id), _names_key(auction_id), _bidders_key(auction_id), _series_key(auction_id)]
+
+
+# Lua shared by the bid engine's accept script and the summary script, so
+# frames and the stats endpoint compute the same numbers the same way.
+#
+# stats_record folds newly recorded bids into the stats. Every recorded bid is
+# the auction's highest so far, hence also its bidder's best, so a plain ZADD
+# keeps the leaderboard right. Series buckets are STATS_BUCKET_SECONDS wide.
+#
+# stats_summary returns unique bidders, bids per minute over the velocity
+# window ending in the bucket containing ``now``, and the top bidders.
+STATS_LUA = """
+local function stats_record(keys, entries, price, now, bucket_size, expires)
+    for _, entry in ipairs(entries) do
+        redis.call('ZADD', keys[1], entry['bid_amount'], entry['user_id'])
+        redis.call('HSET', keys[2], entry['user_id'], entry['user_name'])
+        redis.call('PFADD', keys[3], entry['user_id'])
+    end
+    local bucket = math.floor(now / bucket_size) * bucket_size
+    redis.call('HINCRBY', keys[4], bucket .. ':n', #entries)
+    redis.call('HSET', keys[4], bucket .. ':p', price)
+    for _, key in ipairs(keys) do
+        redis.call('EXPIREAT', key, expires)
+    end
+end
+
+local function stats_summary(keys, now, bucket_size, window, top)
+    local best = redis.call('ZREVRANGE', keys[1], 0, top - 1, 'WITHSCORES')
+    local leaders = {}
+    for i = 1, #best, 2 do
+        leaders[#leaders + 1] = {user_name = redis.call('HGET', keys[2], best[i]), bid_amount = tonumber(best[i + 1])}
+    end
+    local bucket = math.floor(now / bucket_size) * bucket_size
+    local recent = 0
+    for start = bucket - window + bucket_size, bucket, bucket_size do
+        recent = recent + (tonumber(redis.call('HGET', keys[4], start .. ':n')) or 0)
+    end
+    return {unique_bidders = redis.call('PFCOUNT', keys[3]), bids_per_minute = recent * 60 / window, leaders = leaders}
+end
+"""
+
+# KEYS: stats_keys(); ARGV: now, bucket size, velocity window, top
+SUMMARY_SCRIPT = STATS_LUA + """
+return cjson.encode(stats_summary(KEYS, tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])))
+"""
+
+
+def parse_summary(encoded: str) -> dict:
+    summary = json.loads(encoded)
+    # cjson writes an empty list as {} and whole numbers without a fraction
+    summary["bids_per_minute"] = float(summary["bids_per_minute"])
+    summary["leaders"] = [
+        {"user_name": leader["user_name"], "bid_amount": float(leader["bid_amount"])}
+        for leader in summary["leaders"] or []
+    ]
+    return summary
+
+
+# Read side of the per-auction statistics. The bid engine keeps them up to
+# date inside its accept script, so reads never touch Mongo or scan bids.
+class AuctionStats:
+    def __init__(self):
+        self._summary = redis_client.register_script(SUMMARY_SCRIPT)
+
+    async def summary(self, auction_id: str, top: int) -> dict:
+        """Unique bidders, recent bids per minute and the top ``top`` bidders."""
+        encoded = await self._summary(
+            keys=stats_keys(auction_id),
+            args=[time.time(), STATS_BUCKET_SECONDS, STATS_VELOCITY_WINDOW, top]
+        )
+        return parse_summary(encoded)
+
+    async def price_series(self, auction_id: str, resolution: Optional[int] = None) -> list:
+        """Closing price and bid count per time bucket, oldest first.
+
+        ``resolution`` (seconds) merges the stored buckets into wider ones; it
+        is rounded up to a multiple of STATS_BUCKET_SECONDS.
+        """
+        step = STATS_BUCKET_SECONDS * max(1, math.ceil((resolution or STATS_BUCKET_SECONDS) / STATS_BUCKET_SECONDS))
+        buckets: dict = {}
+        for field, value in (await redis_client.hgetall(_series_key(auction_id))).items():
+            start, kind = field.split(':')
+            point = buckets.setdefault(int(start) // step * step, {"price": None, "bids": 0, "last": -1})
+            if kind == 'n':
+                point["bids"] += int(value)
+            elif int(start) > point["last"]:
+                # The merged bucket closes at the price of its latest stored bucket
+                point["price"], point["last"] = float(value), int(start)
+        return [
+            {
+                "time": datetime.fromtimestamp(start, timezone.utc).isoformat().replace('+00:00', 'Z'),
+                "price": point["price"],
+                "bids": point["bids"]
+            }
+            for start, point in sorted(buckets.items())
+        ]
+
+
+auction_stats = AuctionStats()
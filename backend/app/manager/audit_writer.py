@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Optional
+
+from app.config import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL,
+    AUDIT_OVERFLOW_POLICY,
+    AUDIT_QUEUE_SIZE,
+    AUDIT_RETRY_ATTEMPTS,
+    AUDIT_RETRY_BACKOFF,
+)
+from app.core.metrics import register_stats
+from app.db import db, insert_new
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# What log() does when the queue is full: wait for room, or drop the entry
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+
+# Queued by stop() behind everything else so the writer exits after flushing it
+_STOP = object()
+
+MAX_RETRY_BACKOFF = 30.0
+
+
+# Write-behind sink for audit logs: producers enqueue, one task batches the inserts
+class AuditWriter:
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, overflow_policy: str):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        # Entries given up on after every insert attempt failed
+        self.failed = 0
+        self._max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer."""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+            self._queue = None
+
+    async def log(self, auction_id: str, user_id: str, message: str):
+        await self.submit(AuditLog(id=str(uuid.uuid4()), auction_id=auction_id, user_id=user_id, message=message))
+
+    async def submit(self, audit_log: AuditLog):
+        if self._queue is None:
+            # Not started (scripts, tests): write straight through
+            await db.audit_logs.insert_one(audit_log.model_dump())
+            return
+        if self.overflow_policy == OVERFLOW_DROP:
+            try:
+                self._queue.put_nowait(audit_log)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning("Audit queue full, dropped entry for auction %s", audit_log.auction_id)
+            return
+        await self._queue.put(audit_log)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        return {"queue_depth": self.queue_depth(), "dropped": self.dropped, "failed": self.failed}
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            # Keep collecting until the batch is full or the flush interval is up
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                stopping = True
+            await self._flush_with_retry(batch)
+
+    async def _flush_with_retry(self, batch: list):
+        # The batch stays at the head: nothing queued behind it is written
+        # until it succeeds or is given up on
+        delay = AUDIT_RETRY_BACKOFF
+        for attempt in range(1, AUDIT_RETRY_ATTEMPTS + 1):
+            try:
+                await self._flush(batch)
+                return
+            except Exception:
+                if attempt == AUDIT_RETRY_ATTEMPTS:
+                    self.failed += len(batch)
+                    logger.exception("Giving up on %d audit logs after %d attempts", len(batch), attempt)
+                    return
+                logger.warning("Failed to write %d audit logs, retrying in %.1fs", len(batch), delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_BACKOFF)
+
+    async def _flush(self, batch: list):
+        if batch:
+            # _id is the entry's own id, so a retry after a partial write skips
+            # what already landed instead of duplicating it
+            await insert_new(db.audit_logs, [{"_id": audit_log.id, **audit_log.model_dump()} for audit_log in batch])
+
+
+audit_writer = AuditWriter(AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_OVERFLOW_POLICY)
+register_stats("audit_log", "Write-behind audit log sink", audit_writer.stats, counters=("dropped", "failed"))
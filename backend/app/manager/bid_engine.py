@@ -0,0 +1,424 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import (
+    BID_INCREMENT,
+    BID_PERSIST_BATCH_SIZE,
+    BID_PERSIST_INTERVAL,
+    HOT_STATE_GRACE_SECONDS,
+    STATS_BUCKET_SECONDS,
+    STATS_FRAME_LEADERS,
+    STATS_TTL,
+    STATS_VELOCITY_WINDOW,
+)
+from app.db import db, insert_new, redis_client
+from app.manager.auction_stats import STATS_LUA, parse_summary, stats_keys
+from app.models.bid import BidResult
+
+logger = logging.getLogger(__name__)
+
+BID_OUTBOX_KEY = 'bids:outbox'
+
+# Seed the hot state only if no other worker got there first
+LOAD_STATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1],
+    'starting_price', ARGV[1],
+    'start_ts', ARGV[2],
+    'end_ts', ARGV[3],
+    'highest', ARGV[4],
+    'bidder_id', ARGV[5],
+    'bidder_name', ARGV[6],
+    'total_bids', ARGV[7])
+redis.call('EXPIREAT', KEYS[1], ARGV[8])
+return 1
+"""
+
+# Validate and apply one bid against the hot state, resolving proxy bids.
+#
+# The leader's maximum (proxy_max) is the whole proxy book: every other
+# bidder's maximum has already been beaten, so a challenger only ever has to be
+# compared with it. A challenger with a higher maximum takes the lead at one
+# increment over the old maximum; otherwise the leader is bid up to one
+# increment over the challenger. Either way the bids this produces are
+# recorded and queued on the outbox in the same step, so nothing can be lost
+# in between. The auction's running stats are updated in the same step too,
+# and their summary returned for the new_bid frame.
+#
+# The clock is Redis's own, so every worker judges the end time the same way
+# and in the same order as close_auction's CLOSE_AUCTION_SCRIPT.
+#
+# KEYS: hot state, outbox, then the four stats_keys()
+# ARGV: amount, user_id, user_name, bid JSON, maximum ('' for a plain bid),
+# increment, id for an automatic bid placed on the leader's behalf, stats
+# bucket size, velocity window, leaders in the summary, stats TTL
+ACCEPT_BID_SCRIPT = STATS_LUA + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'missing'}
+end
+local state = redis.call('HMGET', KEYS[1],
+    'start_ts', 'end_ts', 'highest', 'starting_price', 'bidder_id', 'bidder_name', 'proxy_max', 'closed')
+if state[8] then
+    return {'closed'}
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+if now < tonumber(state[1]) then
+    return {'not_started'}
+end
+if now > tonumber(state[2]) then
+    return {'ended'}
+end
+
+local function cents(value)
+    return math.floor(value * 100 + 0.5) / 100
+end
+
+local highest = tonumber(state[3])
+local floor = highest or tonumber(state[4])
+local amount = tonumber(ARGV[1])
+local maximum = tonumber(ARGV[5]) or amount
+local increment = tonumber(ARGV[6])
+local leader_id, leader_name = state[5], state[6]
+local leader_max = tonumber(state[7]) or highest
+
+if leader_id == ARGV[2] and ARGV[5] ~= '' and amount <= floor then
+    -- The leader raising their own maximum; the price stays where it is
+    if maximum <= leader_max then
+        return {'too_low', tostring(leader_max)}
+    end
+    redis.call('HSET', KEYS[1], 'proxy_max', maximum)
+    return {'max_raised', redis.call('HGET', KEYS[1], 'total_bids'), tostring(floor), leader_id, leader_name, '[]'}
+end
+if amount <= floor then
+    return {'too_low', state[3] ~= '' and state[3] or state[4]}
+end
+
+local bid = cjson.decode(ARGV[4])
+local recorded = {}
+local function record(entry)
+    entry['total_bids'] = redis.call('HINCRBY', KEYS[1], 'total_bids', 1)
+    redis.call('RPUSH', KEYS[2], cjson.encode(entry))
+    table.insert(recorded, entry)
+end
+local function automatic(user_id, user_name, value)
+    local entry = cjson.decode(ARGV[4])
+    entry['id'] = ARGV[7]
+    entry['user_id'] = user_id
+    entry['user_name'] = user_name
+    entry['bid_amount'] = value
+    entry['proxy'] = true
+    return entry
+end
+
+local outcome = 'accepted'
+local price, new_leader, new_leader_name, new_max
+if leader_id == '' or leader_id == ARGV[2] or maximum > leader_max then
+    -- The bidder leads: at their own amount, or just enough to beat the old maximum
+    price = amount
+    if leader_id ~= '' and leader_id ~= ARGV[2] then
+        price = math.max(amount, cents(math.min(maximum, leader_max + increment)))
+        if leader_max > highest then
+            -- The old leader's proxy bid up to its maximum before losing
+            record(automatic(leader_id, leader_name, leader_max))
+        end
+    end
+    bid['bid_amount'] = price
+    bid['proxy'] = price ~= amount
+    record(bid)
+    new_leader, new_leader_name = ARGV[2], ARGV[3]
+    new_max = math.max(maximum, leader_id == ARGV[2] and leader_max or 0)
+else
+    -- The leader's proxy answers; the bidder's maximum is spent
+    outcome = 'outbid'
+    bid['bid_amount'] = maximum
+    bid['proxy'] = maximum ~= amount
+    record(bid)
+    price = cents(math.min(leader_max, maximum + increment))
+    record(automatic(leader_id, leader_name, price))
+    new_leader, new_leader_name, new_max = leader_id, leader_name, leader_max
+end
+
+redis.call('HSET', KEYS[1],
+    'highest', price, 'bidder_id', new_leader, 'bidder_name', new_leader_name, 'proxy_max', new_max)
+
+local stats = {KEYS[3], KEYS[4], KEYS[5], KEYS[6]}
+local bucket_size = tonumber(ARGV[8])
+stats_record(stats, recorded, price, now, bucket_size, math.ceil(tonumber(state[2])) + tonumber(ARGV[11]))
+local summary = stats_summary(stats, now, bucket_size, tonumber(ARGV[9]), tonumber(ARGV[10]))
+return {outcome, tostring(recorded[#recorded]['total_bids']), tostring(price), new_leader, new_leader_name,
+    cjson.encode(recorded), cjson.encode(summary)}
+"""
+
+# Mark the hot state closed and return it, in one step. No bid can land
+# after the state is read, since ACCEPT_BID_SCRIPT rejects a closed auction.
+# The closed state stays until its expiry, so the auction cannot be warmed
+# again in the meantime. Closing twice returns the same state.
+CLOSE_AUCTION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+redis.call('HSET', KEYS[1], 'closed', '1')
+return redis.call('HGETALL', KEYS[1])
+"""
+
+
+def _state_key(auction_id: str) -> str:
+    return f'auction:{auction_id}:state'
+
+
+def _live_fields(state: dict) -> dict:
+    highest = float(state['highest']) if state['highest'] else None
+    return {
+        "current_highest_bid": highest,
+        "current_price": highest if highest is not None else float(state['starting_price']),
+        "current_highest_bidder_id": state['bidder_id'] or None,
+        "current_highest_bidder_name": state['bidder_name'] or None,
+        "total_bids": int(state['total_bids'])
+    }
+
+
+# Authoritative state for ongoing auctions, held in Redis
+class BidEngine:
+    def __init__(self):
+        self._load_state = redis_client.register_script(LOAD_STATE_SCRIPT)
+        self._accept_bid = redis_client.register_script(ACCEPT_BID_SCRIPT)
+        self._close_auction = redis_client.register_script(CLOSE_AUCTION_SCRIPT)
+        self._persist_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._persist_task is None:
+            self._persist_task = asyncio.create_task(self._persist_loop())
+
+    async def stop(self):
+        if self._persist_task is not None:
+            self._persist_task.cancel()
+            try:
+                await self._persist_task
+            except asyncio.CancelledError:
+                pass
+            self._persist_task = None
+        # Drain whatever is still queued so a clean shutdown loses nothing
+        while await self._persist_batch():
+            pass
+
+    async def place_bid(self, auction_id: str, user_id: str, user_name: str, bid: dict,
+                        max_amount: Optional[float] = None) -> BidResult:
+        """Accept or reject ``bid`` in one Redis round trip.
+
+        ``bid`` is the bid document to persist. With ``max_amount`` it is a
+        proxy bid: the engine bids on the user's behalf, up to that maximum,
+        against any other proxy. Every bid this produces is queued for Mongo
+        and returned in ``BidResult.bids``, oldest first.
+        """
+        keys, args = self._accept_args(auction_id, user_id, user_name, bid, max_amount)
+        result = await self._accept_bid(keys=keys, args=args)
+        if result[0] == 'missing':
+            if not await self.warm(auction_id):
+                exists = await db.auctions.find_one({"id": auction_id}, {"_id": 1})
+                return BidResult(accepted=False, reason='not_found' if not exists else 'inactive')
+            result = await self._accept_bid(keys=keys, args=args)
+        return await self._bid_result(auction_id, user_id, result)
+
+    async def place_bids(self, requests: list) -> list:
+        """Accept or reject many bids, in order, in one pipelined Redis round trip.
+
+        ``requests`` holds ``(auction_id, user_id, user_name, bid, max_amount)``
+        tuples, as for place_bid. Redis runs the scripts one after another in
+        request order, so bids on the same auction are judged in the order
+        given. Auctions not yet in Redis are warmed first, once each.
+        """
+        auction_ids = list(dict.fromkeys(request[0] for request in requests))
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for auction_id in auction_ids:
+                pipe.exists(_state_key(auction_id))
+            hot = await pipe.execute()
+        cold = [auction_id for auction_id, exists in zip(auction_ids, hot) if not exists]
+        warmed = await asyncio.gather(*[self.warm(auction_id) for auction_id in cold])
+        unavailable = {auction_id for auction_id, ok in zip(cold, warmed) if not ok}
+        if unavailable:
+            found = await db.auctions.distinct("id", {"id": {"$in": list(unavailable)}})
+        else:
+            found = []
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for auction_id, user_id, user_name, bid, max_amount in requests:
+                if auction_id not in unavailable:
+                    keys, args = self._accept_args(auction_id, user_id, user_name, bid, max_amount)
+                    await self._accept_bid(keys=keys, args=args, client=pipe)
+            replies = iter(await pipe.execute())
+
+        results = []
+        for auction_id, user_id, _, _, _ in requests:
+            if auction_id in unavailable:
+                results.append(BidResult(accepted=False, reason='inactive' if auction_id in found else 'not_found'))
+                continue
+            result = next(replies)
+            if result[0] == 'missing':
+                # Ended and dropped from Redis since it was warmed
+                results.append(BidResult(accepted=False, reason='inactive'))
+                continue
+            results.append(await self._bid_result(auction_id, user_id, result))
+        return results
+
+    @staticmethod
+    def _accept_args(auction_id: str, user_id: str, user_name: str, bid: dict,
+                     max_amount: Optional[float]) -> tuple:
+        args = [
+            repr(float(bid['bid_amount'])),
+            user_id,
+            user_name,
+            json.dumps(bid),
+            repr(float(max_amount)) if max_amount is not None else '',
+            repr(float(BID_INCREMENT)),
+            str(uuid.uuid4()),
+            STATS_BUCKET_SECONDS,
+            STATS_VELOCITY_WINDOW,
+            STATS_FRAME_LEADERS,
+            STATS_TTL
+        ]
+        return [_state_key(auction_id), BID_OUTBOX_KEY, *stats_keys(auction_id)], args
+
+    async def _bid_result(self, auction_id: str, user_id: str, result: list) -> BidResult:
+        if result[0] in ('accepted', 'outbid', 'max_raised'):
+            bids = json.loads(result[5])
+            for placed in bids:
+                placed.pop('total_bids')
+                # cjson writes whole numbers without a fraction
+                placed['bid_amount'] = float(placed['bid_amount'])
+            return BidResult(
+                accepted=True,
+                reason='outbid' if result[0] == 'outbid' else None,
+                leading=result[3] == user_id,
+                current_highest_bid=float(result[2]),
+                current_highest_bidder_name=result[4],
+                total_bids=int(result[1]),
+                bids=bids,
+                stats=parse_summary(result[6]) if len(result) > 6 else None
+            )
+        if result[0] == 'too_low':
+            return BidResult(accepted=False, reason='too_low', min_bid=float(result[1]))
+        if result[0] == 'ended':
+            await self.close_auction(auction_id)
+        # 'ended' or 'closed'; the latter was already written through
+        return BidResult(accepted=False, reason='inactive')
+
+    async def current_state(self, auction_id: str) -> Optional[dict]:
+        """The live bid fields of a hot auction, or None if it is not held in Redis."""
+        state = await redis_client.hgetall(_state_key(auction_id))
+        if not state:
+            return None
+        return _live_fields(state)
+
+    async def current_states(self, auction_ids: list) -> list:
+        """current_state for many auctions, in order, in one pipelined round trip."""
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for auction_id in auction_ids:
+                pipe.hgetall(_state_key(auction_id))
+            states = await pipe.execute()
+        return [_live_fields(state) if state else None for state in states]
+
+    async def close_auction(self, auction_id: str) -> Optional[dict]:
+        """Stop bidding on a hot auction and write its final state through to Mongo.
+
+        Returns the final bid fields, as current_state does, or None if the
+        auction was not held in Redis.
+        """
+        reply = await self._close_auction(keys=[_state_key(auction_id)])
+        if not reply:
+            return None
+        final = _live_fields(dict(zip(reply[::2], reply[1::2])))
+        await db.auctions.update_one(
+            {"id": auction_id, "total_bids": {"$lte": final["total_bids"]}},
+            {"$set": final}
+        )
+        return final
+
+    async def warm(self, auction_id: str) -> bool:
+        """Load an ongoing auction into Redis. Returns False if it is not biddable."""
+        auction = await db.auctions.find_one({"id": auction_id}, {"_id": 0})
+        if not auction:
+            return False
+
+        start_ts = auction['start_time'].timestamp()
+        end_ts = auction['end_time'].timestamp()
+        now = datetime.now(timezone.utc).timestamp()
+        if not start_ts <= now <= end_ts:
+            return False
+
+        highest = auction.get('current_highest_bid')
+        await self._load_state(
+            keys=[_state_key(auction_id)],
+            args=[
+                repr(float(auction.get('starting_price', 0))),
+                start_ts,
+                end_ts,
+                repr(float(highest)) if isinstance(highest, (int, float)) else '',
+                auction.get('current_highest_bidder_id') or '',
+                auction.get('current_highest_bidder_name') or '',
+                auction.get('total_bids', 0),
+                int(end_ts) + HOT_STATE_GRACE_SECONDS
+            ]
+        )
+        return True
+
+    async def _persist_loop(self):
+        while True:
+            try:
+                if not await self._persist_batch():
+                    await asyncio.sleep(BID_PERSIST_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to persist accepted bids")
+                await asyncio.sleep(BID_PERSIST_INTERVAL)
+
+    async def _persist_batch(self) -> int:
+        entries = await redis_client.lpop(BID_OUTBOX_KEY, BID_PERSIST_BATCH_SIZE)
+        if not entries:
+            return 0
+
+        bids = []
+        latest = {}
+        for entry in entries:
+            bid = json.loads(entry)
+            total_bids = bid.pop('total_bids')
+            # cjson writes whole numbers without a fraction
+            bid['bid_amount'] = float(bid['bid_amount'])
+            bid['created_at'] = datetime.fromisoformat(bid['created_at'])
+            bids.append(bid)
+            current = latest.get(bid['auction_id'])
+            if current is None or total_bids > current[0]:
+                latest[bid['auction_id']] = (total_bids, bid)
+
+        try:
+            await insert_new(db.bids, bids)
+            # One update per auction; total_bids only grows, so it orders the
+            # writes and a stale snapshot can never overwrite a newer one
+            await asyncio.gather(*[
+                db.auctions.update_one(
+                    {"id": auction_id, "total_bids": {"$lt": total_bids}},
+                    {"$set": {
+                        "current_highest_bid": bid['bid_amount'],
+                        "current_price": bid['bid_amount'],
+                        "current_highest_bidder_id": bid['user_id'],
+                        "current_highest_bidder_name": bid['user_name'],
+                        "total_bids": total_bids
+                    }}
+                )
+                for auction_id, (total_bids, bid) in latest.items()
+            ])
+        except Exception:
+            # Put the batch back at the head of the queue and retry later
+            await redis_client.lpush(BID_OUTBOX_KEY, *reversed(entries))
+            raise
+        return len(entries)
+
+
+bid_engine = BidEngine()
@@ -1,40 +1,434 @@
 from fastapi import WebSocket
-import json
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+import orjson
+from app.config import (
+    BROADCAST_TICK_MS,
+    EVENT_STREAM_MAXLEN,
+    EVENT_STREAM_TTL,
+    WS_QUEUE_SIZE,
+    WS_SEND_TIMEOUT,
+    WS_SLOW_CONSUMER_SECONDS,
+)
+from app.core.metrics import (
+    REDIS_PUBLISH_SECONDS,
+    WS_FANOUT_SECONDS,
+    WS_SEND_SECONDS,
+    WS_SLOW_CONSUMERS,
+    register_websocket_gauge,
+)
 from app.db import redis_client
 
+logger = logging.getLogger(__name__)
+
+AUCTION_CHANNEL_PATTERN = 'auction:*'
+
+# Frames that carry the full auction state, so a newer one supersedes older ones
+COALESCABLE_TYPES = {"new_bid", "bids_batch"}
+
+# Close code for clients dropped because they could not keep up
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Close code for sockets opened on an auction that does not exist
+NOT_FOUND_CLOSE_CODE = 1008
+
+# A client further behind than this gets a snapshot instead of a replay
+MAX_REPLAY_FRAMES = WS_QUEUE_SIZE // 2
+
+# Number the event, keep it in the auction's capped stream and publish it, in
+# one step so the stream and the live channel always agree. The sequence
+# number is spliced into the already-encoded JSON object rather than
+# re-encoding it. Stream IDs are "<seq>-0", so resuming is a range read.
+PUBLISH_EVENT_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local frame = '{"seq":' .. seq .. ',' .. string.sub(ARGV[1], 2)
+local added = redis.pcall('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], seq .. '-0', 'frame', frame)
+if type(added) == 'table' and added.err then
+    -- The counter was lost while the stream survived; start the stream over
+    redis.call('DEL', KEYS[2])
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], seq .. '-0', 'frame', frame)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('PUBLISH', ARGV[2], frame)
+return seq
+"""
+
+
+def event_seq_key(auction_id: str) -> str:
+    return f'auction:{auction_id}:seq'
+
+
+def _stream_key(auction_id: str) -> str:
+    return f'auction:{auction_id}:events'
+
+
+def _stream_seq(entry_id: str) -> int:
+    return int(entry_id.split('-', 1)[0])
+
+
+class _Connection:
+    """One socket with its own bounded outbound queue and writer task.
+
+    A socket may be subscribed to several auctions; ``auctions`` tracks which.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.auctions: set = set()
+        # Live frames held back per auction while its catch-up frames are built
+        self.holding: dict = {}
+        # (auction_id, kind, payload), oldest first
+        self.pending: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.behind_since = None
+        self.writer = None
+
+    def enqueue(self, auction_id: str, kind: str, payload: str) -> bool:
+        """Queue a frame. Returns False once the client is too far behind to keep."""
+        if auction_id in self.holding:
+            self.holding[auction_id].append((kind, payload))
+            return True
+        if len(self.pending) >= WS_QUEUE_SIZE:
+            now = time.monotonic()
+            if self.behind_since is None:
+                self.behind_since = now
+            elif now - self.behind_since > WS_SLOW_CONSUMER_SECONDS:
+                return False
+            # The new frame carries the latest state of its auction, so the
+            # queued ones it supersedes can go
+            if kind in COALESCABLE_TYPES:
+                self.pending = deque(
+                    frame for frame in self.pending
+                    if frame[0] != auction_id or frame[1] not in COALESCABLE_TYPES
+                )
+            if len(self.pending) >= WS_QUEUE_SIZE:
+                return False
+        self.pending.append((auction_id, kind, payload))
+        self.wakeup.set()
+        return True
+
+
 # WebSocket connection manager with Redis pub/sub
 class ConnectionManager:
     def __init__(self):
+        # auction_id -> {websocket: _Connection} for every socket subscribed to it
         self.active_connections: dict = {}
+        # websocket -> _Connection for every open socket
+        self._connections: dict = {}
         self.pubsub = None
-        
-    async def connect(self, websocket: WebSocket, auction_id: str, user_id: str):
+        self._listener_task = None
+        # Bid events waiting for the next tick, per auction, when batching is on
+        self._pending_bids: dict = {}
+        self._flush_task = None
+        # Other channels sharing this worker's subscriber connection
+        self._channel_handlers: dict = {}
+        # Called as hook(pipeline, auction_id, message) when an event is published
+        self._publish_hooks: list = []
+        # Called as handler(auction_id, message) for every event this worker receives
+        self._event_handlers: list = []
+        self._publish_event = redis_client.register_script(PUBLISH_EVENT_SCRIPT)
+
+    def add_channel_handler(self, channel: str, handler):
+        """Call ``handler(data)`` for each message on ``channel``. Register before start()."""
+        self._channel_handlers[channel] = handler
+
+    def add_publish_hook(self, hook):
+        self._publish_hooks.append(hook)
+
+    def add_event_handler(self, handler):
+        self._event_handlers.append(handler)
+
+    async def start(self):
+        """Subscribe once to every auction channel for this worker process."""
+        if self._listener_task is not None:
+            return
+        self.pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.psubscribe(AUCTION_CHANNEL_PATTERN)
+        if self._channel_handlers:
+            await self.pubsub.subscribe(*self._channel_handlers)
+        self._listener_task = asyncio.create_task(self._listen())
+        if BROADCAST_TICK_MS > 0:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_bids()
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+
+    async def accept(self, websocket: WebSocket, user_id: str) -> _Connection:
+        """Accept a socket with no subscriptions yet; see subscribe()."""
         await websocket.accept()
-        if auction_id not in self.active_connections:
-            self.active_connections[auction_id] = []
-        self.active_connections[auction_id].append({"websocket": websocket, "user_id": user_id})
-        
-    def disconnect(self, websocket: WebSocket, auction_id: str):
-        if auction_id in self.active_connections:
-            self.active_connections[auction_id] = [
-                conn for conn in self.active_connections[auction_id] 
-                if conn["websocket"] != websocket
-            ]
-            if not self.active_connections[auction_id]:
-                del self.active_connections[auction_id]
-    
+        conn = _Connection(websocket, user_id)
+        conn.writer = asyncio.create_task(self._write(conn))
+        self._connections[websocket] = conn
+        return conn
+
+    async def connect(self, websocket: WebSocket, auction_id: str, user_id: str,
+                      since: Optional[int] = None, snapshot=None) -> bool:
+        """Accept a socket subscribed to a single auction.
+
+        Returns False, after closing the socket, if the auction does not exist.
+        """
+        conn = await self.accept(websocket, user_id)
+        if await self.subscribe(conn, auction_id, since, snapshot):
+            return True
+        self.disconnect(websocket)
+        await websocket.send_text(orjson.dumps(self.not_found(auction_id)).decode())
+        await websocket.close(code=NOT_FOUND_CLOSE_CODE)
+        return False
+
+    async def subscribe(self, conn: _Connection, auction_id: str,
+                        since: Optional[int] = None, snapshot=None) -> bool:
+        """Add an auction to a socket and catch it up before live events flow.
+
+        A client that passes the last sequence number it saw gets the events it
+        missed; anyone else gets ``await snapshot(seq)``, a frame describing the
+        auction as of event ``seq``. Returns False if the snapshot is None
+        because the auction does not exist.
+        """
+        if auction_id in conn.auctions:
+            return True
+        # Registered before the stream is read so nothing published meanwhile
+        # is missed, but held back until the catch-up frames are queued;
+        # clients drop anything at or below a sequence they have seen
+        conn.holding[auction_id] = []
+        conn.auctions.add(auction_id)
+        self.active_connections.setdefault(auction_id, {})[conn.websocket] = conn
+
+        try:
+            frames = await self._replay(auction_id, since) if since is not None else None
+            if frames is None and snapshot is not None:
+                frame = await snapshot(await self.current_seq(auction_id))
+                frames = [orjson.dumps(frame).decode()] if frame is not None else None
+        except Exception:
+            self.unsubscribe(conn, auction_id)
+            raise
+        if frames is None and snapshot is not None:
+            self.unsubscribe(conn, auction_id)
+            return False
+
+        held = conn.holding.pop(auction_id)
+        frames = [("catch_up", frame) for frame in frames or []] + held
+        if not all(conn.enqueue(auction_id, kind, payload) for kind, payload in frames):
+            self._drop(conn)
+        return True
+
+    def unsubscribe(self, conn: _Connection, auction_id: str):
+        conn.auctions.discard(auction_id)
+        conn.holding.pop(auction_id, None)
+        connections = self.active_connections.get(auction_id)
+        if connections is None:
+            return
+        connections.pop(conn.websocket, None)
+        if not connections:
+            del self.active_connections[auction_id]
+
+    def send(self, conn: _Connection, message: dict):
+        """Queue a direct reply to one socket, behind anything already queued for it."""
+        if not conn.enqueue(message.get("auction_id", ""), message["type"], orjson.dumps(message).decode()):
+            self._drop(conn)
+
+    def disconnect(self, websocket: WebSocket):
+        conn = self._connections.pop(websocket, None)
+        if conn is None:
+            return
+        for auction_id in list(conn.auctions):
+            self.unsubscribe(conn, auction_id)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    @staticmethod
+    def not_found(auction_id: str) -> dict:
+        return {"type": "error", "auction_id": auction_id, "detail": "Auction not found"}
+
+    async def current_seq(self, auction_id: str) -> int:
+        return int(await redis_client.get(event_seq_key(auction_id)) or 0)
+
+    async def recent_bids(self, auction_id: str, count: int, max_seq: Optional[int] = None) -> list:
+        """Up to ``count`` of the latest bids still held in the event stream, newest first.
+
+        With ``max_seq``, only bids from events up to that sequence number.
+        """
+        bids = []
+        upper = f'{max_seq}-0' if max_seq is not None else '+'
+        # Each bid event holds at least one bid, so pages of ``count`` entries
+        # usually finish in one round trip, even while many clients resync
+        while len(bids) < count:
+            entries = await redis_client.xrevrange(_stream_key(auction_id), max=upper, count=count)
+            for _, fields in entries:
+                message = orjson.loads(fields['frame'])
+                if message.get("type") == "new_bid":
+                    bids.extend(reversed(message.get("bids", [message["bid"]])))
+                elif message.get("type") == "bids_batch":
+                    bids.extend(reversed(message["bids"]))
+            if len(entries) < count:
+                break
+            upper = f'({entries[-1][0]}'
+        return bids[:count]
+
+    async def _replay(self, auction_id: str, since: int) -> Optional[list]:
+        """Frames published after ``since``, or None if they can no longer be replayed."""
+        seq = await self.current_seq(auction_id)
+        if since == seq:
+            return []
+        if since > seq:
+            # The client saw a sequence this stream never reached; it was reset
+            return None
+        entries = await redis_client.xrange(
+            _stream_key(auction_id), min=f'{since + 1}-0', count=MAX_REPLAY_FRAMES + 1
+        )
+        if not entries or _stream_seq(entries[0][0]) != since + 1 or len(entries) > MAX_REPLAY_FRAMES:
+            # Trimmed past the client's position, or too far behind to be worth replaying
+            return None
+        return [fields['frame'] for _, fields in entries]
+
+    def connection_counts(self) -> dict:
+        return {auction_id: len(connections) for auction_id, connections in self.active_connections.items()}
+
     async def broadcast_to_auction(self, auction_id: str, message: dict):
-        # Publish to Redis for multi-instance support
-        await redis_client.publish(f'auction:{auction_id}', json.dumps(message))
-        
-        # Also send to local connections
-        if auction_id in self.active_connections:
-            disconnected = []
-            for conn in self.active_connections[auction_id]:
-                try:
-                    await conn["websocket"].send_json(message)
-                except Exception:
-                    disconnected.append(conn)
-            
-            for conn in disconnected:
-                self.disconnect(conn["websocket"], auction_id)
\ No newline at end of file
+        if self._flush_task is not None:
+            if message.get("type") == "new_bid":
+                self._pending_bids.setdefault(auction_id, []).append(message)
+                return
+            # Keep other events ordered after the bids that came before them
+            pending = self._pending_bids.pop(auction_id, None)
+            if pending:
+                await self._publish(auction_id, self._batch_message(pending))
+        await self._publish(auction_id, message)
+
+    async def _publish(self, auction_id: str, message: dict):
+        # Serialized once here; every worker, including this one, receives the
+        # encoded payload back through _listen and forwards it untouched
+        # auction_id rides on every frame so multiplexed clients can route it
+        payload = orjson.dumps({"auction_id": auction_id, **message})
+        keys = [event_seq_key(auction_id), _stream_key(auction_id)]
+        args = [payload, f'auction:{auction_id}', EVENT_STREAM_MAXLEN, EVENT_STREAM_TTL]
+        with REDIS_PUBLISH_SECONDS.time():
+            if not self._publish_hooks:
+                await self._publish_event(keys=keys, args=args)
+                return
+            # MULTI, so a hook's cache invalidation and the seq bump land
+            # together; see ResponseCache.detail
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for hook in self._publish_hooks:
+                    hook(pipe, auction_id, message)
+                await self._publish_event(keys=keys, args=args, client=pipe)
+                await pipe.execute()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(BROADCAST_TICK_MS / 1000)
+            try:
+                await self._flush_bids()
+            except Exception:
+                logger.exception("Failed to flush batched bid events")
+
+    async def _flush_bids(self):
+        """Publish one frame per auction for everything bid since the last tick."""
+        pending, self._pending_bids = self._pending_bids, {}
+        await asyncio.gather(*[
+            self._publish(auction_id, self._batch_message(messages))
+            for auction_id, messages in pending.items()
+        ])
+
+    @staticmethod
+    def _batch_message(messages: list) -> dict:
+        if len(messages) == 1:
+            return messages[0]
+        batch = {
+            "type": "bids_batch",
+            "bids": [bid for message in messages for bid in message.get("bids", [message["bid"]])],
+            "auction": messages[-1]["auction"]
+        }
+        if "stats" in messages[-1]:
+            batch["stats"] = messages[-1]["stats"]
+        return batch
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message["type"] == "message":
+                        self._channel_handlers[message["channel"]](message["data"])
+                        continue
+                    if message["type"] != "pmessage":
+                        continue
+                    auction_id = message["channel"].split(":", 1)[1]
+                    self._send_local(auction_id, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Auction subscriber failed, resubscribing")
+                await asyncio.sleep(1)
+
+    def _send_local(self, auction_id: str, payload: str):
+        connections = self.active_connections.get(auction_id)
+        if not connections and not self._event_handlers:
+            return
+
+        message = orjson.loads(payload)
+        for handler in self._event_handlers:
+            handler(auction_id, message)
+        if not connections:
+            return
+
+        kind = message.get("type")
+        # Only enqueues; each socket's writer task does the actual send
+        with WS_FANOUT_SECONDS.time():
+            slow = [conn for conn in connections.values() if not conn.enqueue(auction_id, kind, payload)]
+        for conn in slow:
+            logger.info("Dropping slow WebSocket client on auction %s", auction_id)
+            self._drop(conn)
+
+    def _drop(self, conn: _Connection):
+        WS_SLOW_CONSUMERS.inc()
+        self.disconnect(conn.websocket)
+        asyncio.create_task(self._close(conn.websocket))
+
+    async def _write(self, conn: _Connection):
+        try:
+            while True:
+                if not conn.pending:
+                    conn.behind_since = None
+                    conn.wakeup.clear()
+                    await conn.wakeup.wait()
+                    continue
+                _, _, payload = conn.pending.popleft()
+                with WS_SEND_SECONDS.time():
+                    await asyncio.wait_for(conn.websocket.send_text(payload), WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(conn.websocket)
+            await self._close(conn.websocket)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+
+# One manager per worker process, started in the app startup hook
+manager = ConnectionManager()
+register_websocket_gauge(manager.connection_counts)
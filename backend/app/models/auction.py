@@ -1,4 +1,5 @@
 
+from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
@@ -24,6 +25,8 @@ class Auction(BaseModel):
     description: str
     image_url: str
     starting_price: float
+    # The higher of starting_price and current_highest_bid, kept for sorting
+    current_price: Optional[float] = None
     start_time: datetime
     end_time: datetime
     current_highest_bid: Optional[float] = None
@@ -33,6 +36,29 @@ class Auction(BaseModel):
     total_bids: int = 0
     
 
+class AuctionSummary(BaseModel):
+    """The fields a listing card needs."""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    description: str
+    image_url: str
+    starting_price: float
+    current_price: Optional[float] = None
+    start_time: datetime
+    end_time: datetime
+    current_highest_bid: Optional[float] = None
+    status: str
+    total_bids: int = 0
+
+
+class AuctionSort(str, Enum):
+    ENDING_SOON = "ending_soon"
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+
+
 class AuctionCreate(BaseModel):
     title: str
     description: str
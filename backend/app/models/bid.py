@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from datetime import datetime, timezone
 
 class Bid(BaseModel):
@@ -8,7 +10,45 @@ class Bid(BaseModel):
     user_id: str
     user_name: str
     bid_amount: float
+    # Placed automatically by the engine on behalf of a maximum bid
+    proxy: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class BidCreate(BaseModel):
     bid_amount: float
+    # Optional maximum: the engine keeps outbidding others for this user up to it
+    max_amount: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_max_amount(self):
+        if self.max_amount is not None and self.max_amount < self.bid_amount:
+            raise ValueError("max_amount must be at least bid_amount")
+        return self
+
+class BulkBidItem(BidCreate):
+    auction_id: str
+    # The bidder the desk or partner is relaying for
+    user_id: str
+
+class BulkBidCreate(BaseModel):
+    # Applied in order; bids on the same auction are judged in this order
+    bids: List[BulkBidItem] = Field(min_length=1)
+
+class BidResult(BaseModel):
+    accepted: bool
+    reason: Optional[str] = None
+    min_bid: Optional[float] = None
+    current_highest_bid: Optional[float] = None
+    current_highest_bidder_name: Optional[str] = None
+    total_bids: Optional[int] = None
+    # Whether the bidder leads after the engine resolved any proxy bids
+    leading: Optional[bool] = None
+    # Bids recorded by this call, oldest first; more than one when proxies competed
+    bids: list = []
+    # The auction's running stats summary after this bid, for the new_bid frame
+    stats: Optional[dict] = None
+
+
+class BidExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
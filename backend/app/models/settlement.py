@@ -0,0 +1,14 @@
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime, timezone
+
+
+class Settlement(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    auction_id: str
+    winner_id: Optional[str] = None
+    winner_name: Optional[str] = None
+    final_price: Optional[float] = None
+    total_bids: int = 0
+    settled_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
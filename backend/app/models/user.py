@@ -27,6 +27,13 @@ class UserResponse(BaseModel):
     is_admin: bool = False
     
 
+class TokenUser(BaseModel):
+    """The caller as carried in the access token's signed claims."""
+    id: str
+    name: str
+    is_admin: bool = False
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -1,16 +1,42 @@
 # Auction endpoints
+import asyncio
+import csv
+import io
+import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+import orjson
 
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.config import BID_EXPORT_BATCH_SIZE, BULK_BID_MAX_ITEMS, STATS_BUCKET_SECONDS
 from app.db import db
-from app.core.utils import get_auction_status, get_current_user
-from app.manager.connection_manager import ConnectionManager
-from app.models.auction import Auction, AuctionCreate, AuctionStatus
-from app.models.audit import AuditLog
-from app.models.bid import Bid, BidCreate
-from app.models.user import User
+from app.core.idempotency import fingerprint, idempotency
+from app.core.metrics import BID_RESULTS
+from app.core.rate_limit import bid_rate_limit
+from app.core.response_cache import CachedResponse, response_cache
+from app.core.serialization import JSON_OPTIONS, RowShaper, csv_value, dumps
+from app.core.utils import (
+    cursor_datetime,
+    cursor_number,
+    decode_cursor,
+    encode_cursor,
+    get_auction_status,
+    get_current_user,
+    get_token_user,
+    get_status_query,
+    keyset_query,
+)
+from app.manager.audit_writer import audit_writer
+from app.manager.auction_scheduler import auction_scheduler
+from app.manager.auction_stats import auction_stats
+from app.manager.bid_engine import bid_engine
+from app.manager.connection_manager import manager
+from app.models.auction import Auction, AuctionCreate, AuctionSort, AuctionStatus, AuctionSummary
+from app.models.bid import Bid, BidCreate, BidExportFormat, BidResult, BulkBidCreate
+from app.models.user import TokenUser, User
 
 
 api_router = APIRouter(
@@ -19,40 +45,111 @@ api_router = APIRouter(
 )
 
 
-@api_router.get("/", response_model=List[Auction])
-async def get_auctions(status: Optional[str] = None):
-    query = {}
-    auctions = await db.auctions.find(query, {"_id": 0}).to_list(1000)
-    
-    # Update status based on current time
-    for auction in auctions:
-        if isinstance(auction.get('start_time'), str):
-            auction['start_time'] = datetime.fromisoformat(auction['start_time'])
-        if isinstance(auction.get('end_time'), str):
-            auction['end_time'] = datetime.fromisoformat(auction['end_time'])
-        
+# Sort key and direction for each listing order; ties are broken on id
+LISTING_SORTS = {
+    AuctionSort.ENDING_SOON: ("end_time", 1),
+    AuctionSort.NEWEST: ("start_time", -1),
+    AuctionSort.PRICE_ASC: ("current_price", 1),
+    AuctionSort.PRICE_DESC: ("current_price", -1),
+}
+
+TIME_SORT_FIELDS = {"start_time", "end_time"}
+
+LISTING_PROJECTION = {"_id": 0, **{field: 1 for field in AuctionSummary.model_fields}}
+BID_PROJECTION = {"_id": 0, **{field: 1 for field in Bid.model_fields}}
+
+# Stored rows were validated on the way in, so responses skip model
+# construction and are shaped straight from the documents
+summary_row = RowShaper(AuctionSummary)
+auction_row = RowShaper(Auction)
+bid_row = RowShaper(Bid)
+
+
+@api_router.get("/", response_model=List[AuctionSummary])
+async def get_auctions(
+    request: Request,
+    status: Optional[str] = None,
+    sort: AuctionSort = AuctionSort.NEWEST,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    async def build():
+        now = datetime.now(timezone.utc)
+        sort_field, direction = LISTING_SORTS[sort]
+
+        clauses = []
+        if status:
+            clauses.append(get_status_query(status, now))
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            if sort_field in TIME_SORT_FIELDS:
+                value = cursor_datetime(value)
+            else:
+                value = cursor_number(value)
+            clauses.append(keyset_query(sort_field, direction, value, last_id))
+        query = {"$and": clauses} if clauses else {}
+
+        auctions = await db.auctions.find(query, LISTING_PROJECTION) \
+            .sort([(sort_field, direction), ("id", direction)]) \
+            .limit(limit) \
+            .to_list(limit)
+
+        for auction in auctions:
+            auction['status'] = status or get_auction_status(auction['start_time'], auction['end_time'])
+
+        # A full page means there may be more; the client passes this back as ?cursor=
+        headers = {}
+        if len(auctions) == limit:
+            last = auctions[-1]
+            headers["X-Next-Cursor"] = encode_cursor([last.get(sort_field), last['id']])
+
+        return summary_row.many(auctions), headers
+
+    query_key = f"status={status or ''}&sort={sort.value}&limit={limit}&cursor={cursor or ''}"
+    cached = await response_cache.listing(query_key, build, live_rows)
+    return cached.to_response(request)
+
+async def live_rows(rows: list) -> list:
+    """Listing rows with the bid fields of ongoing auctions taken from Redis.
+
+    Mongo trails the bid engine, and shared pages are not retired on bids.
+    A price-sorted page keeps the order it was built in until it expires.
+    """
+    ongoing = [row for row in rows if row['status'] == AuctionStatus.ONGOING]
+    if not ongoing:
+        return rows
+    states = await bid_engine.current_states([row['id'] for row in ongoing])
+    for row, live in zip(ongoing, states):
+        if live:
+            row.update((field, value) for field, value in live.items() if field in row)
+    return rows
+
+async def auction_detail(auction_id: str, min_seq: Optional[int] = None) -> Optional[CachedResponse]:
+    """The cached detail response for an auction, or None if it does not exist.
+
+    ``min_seq`` skips a local entry that predates that auction event.
+    """
+    async def build():
+        auction = await db.auctions.find_one({"id": auction_id}, {"_id": 0})
+        if not auction:
+            return None
+
         auction['status'] = get_auction_status(auction['start_time'], auction['end_time'])
-    
-    # Filter by status if provided
-    if status:
-        auctions = [a for a in auctions if a['status'] == status]
-    
-    return auctions
+        if auction['status'] == AuctionStatus.ONGOING:
+            # Mongo trails the bid engine slightly; take the live bid fields from Redis
+            live = await bid_engine.current_state(auction_id)
+            if live:
+                auction.update(live)
+        return auction_row(auction)
+
+    return await response_cache.detail(auction_id, build, min_seq)
 
 @api_router.get("/{auction_id}", response_model=Auction)
-async def get_auction(auction_id: str):
-    auction = await db.auctions.find_one({"id": auction_id}, {"_id": 0})
-    if not auction:
+async def get_auction(auction_id: str, request: Request):
+    cached = await auction_detail(auction_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Auction not found")
-    
-    if isinstance(auction.get('start_time'), str):
-        auction['start_time'] = datetime.fromisoformat(auction['start_time'])
-    if isinstance(auction.get('end_time'), str):
-        auction['end_time'] = datetime.fromisoformat(auction['end_time'])
-    
-    auction['status'] = get_auction_status(auction['start_time'], auction['end_time'])
-    
-    return Auction(**auction)
+    return cached.to_response(request)
 
 @api_router.post("/", response_model=Auction)
 async def create_auction(auction_data: AuctionCreate, current_user: User = Depends(get_current_user)):
@@ -69,6 +166,7 @@ async def create_auction(auction_data: AuctionCreate, current_user: User = Depen
         description=auction_data.description,
         image_url=auction_data.image_url,
         starting_price=auction_data.starting_price,
+        current_price=auction_data.starting_price,
         start_time=auction_data.start_time,
         end_time=auction_data.end_time,
         current_highest_bid=None,
@@ -78,115 +176,261 @@ async def create_auction(auction_data: AuctionCreate, current_user: User = Depen
     )
     
     auction_dict = auction.model_dump()
-    auction_dict['start_time'] = auction_dict['start_time'].isoformat()
-    auction_dict['end_time'] = auction_dict['end_time'].isoformat()
     
     await db.auctions.insert_one(auction_dict)
+    auction_scheduler.schedule(auction_dict)
+    # Lets every worker drop listing pages the new auction belongs on
+    await manager.broadcast_to_auction(auction_id, {"type": "auction_created", "auction_id": auction_id})
     return auction
 
 @api_router.post("/{auction_id}/bid")
-async def place_bid(auction_id: str, bid_data: BidCreate, current_user: User = Depends(get_current_user)):
-    # Get auction
-    auction = await db.auctions.find_one({"id": auction_id}, {"_id": 0})
-    if not auction:
-        raise HTTPException(status_code=404, detail="Auction not found")
-    
-    if isinstance(auction.get('start_time'), str):
-        auction['start_time'] = datetime.fromisoformat(auction['start_time'])
-    if isinstance(auction.get('end_time'), str):
-        auction['end_time'] = datetime.fromisoformat(auction['end_time'])
-    
-    # Check auction status
-    auction_status = get_auction_status(auction['start_time'], auction['end_time'])
-    if auction_status != AuctionStatus.ONGOING:
+async def place_bid(
+    auction_id: str,
+    bid_data: BidCreate,
+    request: Request,
+    current_user: TokenUser = Depends(get_token_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    if idempotency_key is None:
+        await bid_rate_limit(request)
+        return await _place_bid(auction_id, bid_data, current_user)
+
+    # Retries with the same key get the first attempt's response, accepted or
+    # not; only an attempt that will actually place the bid is rate limited
+    request_fingerprint = fingerprint(auction_id, bid_data.model_dump_json())
+    return await idempotency.run(
+        f'bid:{current_user.id}',
+        idempotency_key,
+        request_fingerprint,
+        lambda: _place_bid(auction_id, bid_data, current_user),
+        admit=lambda: bid_rate_limit(request)
+    )
+
+async def _place_bid(auction_id: str, bid_data: BidCreate, current_user: TokenUser) -> dict:
+    bid_dict = _new_bid(auction_id, current_user.id, current_user.name, bid_data.bid_amount)
+
+    # Validation and acceptance happen atomically in Redis; the bid is
+    # written to Mongo in the background
+    result = await bid_engine.place_bid(
+        auction_id, current_user.id, current_user.name, bid_dict, bid_data.max_amount
+    )
+    BID_RESULTS.labels("accepted" if result.accepted else result.reason).inc()
+    if not result.accepted:
+        if result.reason == 'not_found':
+            raise HTTPException(status_code=404, detail="Auction not found")
+        if result.reason == 'too_low':
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Bid must be higher than current highest bid (${result.min_bid})"
+            )
         raise HTTPException(status_code=400, detail="Auction is not active")
-    
-    # Validate bid amount
-    min_bid = auction.get('current_highest_bid')
-    if not isinstance(min_bid, (int, float)):
-        min_bid = auction.get('starting_price', 0)
-    
-    if bid_data.bid_amount <= min_bid:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Bid must be higher than current highest bid (${min_bid})"
-        )
-    
-    # Create bid
-    import uuid
-    bid_id = str(uuid.uuid4())
+
+    await _audit_bids(auction_id, current_user.id, current_user.name, bid_data.max_amount, result)
+    if result.bids:
+        await manager.broadcast_to_auction(auction_id, _new_bid_message(result.bids, result))
+
+    own_bid = next((placed for placed in result.bids if placed['id'] == bid_dict['id']), None)
+    if not result.bids:
+        text = "Maximum bid updated"
+    elif result.leading:
+        text = "Bid placed successfully"
+    else:
+        text = "Bid placed, but another bidder's maximum is higher"
+    return {
+        "message": text,
+        "leading": result.leading,
+        "current_highest_bid": result.current_highest_bid,
+        "bid": own_bid
+    }
+
+@api_router.post("/bids/bulk")
+async def place_bids_bulk(bulk: BulkBidCreate, current_user: TokenUser = Depends(get_token_user)):
+    """Relay an ordered batch of bids, placed on behalf of other users, across any auctions."""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can relay bids")
+    if len(bulk.bids) > BULK_BID_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_BID_MAX_ITEMS} bids per request")
+
+    user_ids = list({item.user_id for item in bulk.bids})
+    users = {
+        user['id']: user['name']
+        async for user in db.users.find({"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "name": 1})
+    }
+
+    # Every known bidder's bid goes to the engine in one pipelined round trip,
+    # in request order
+    requests = []
+    bid_ids = {}
+    for index, item in enumerate(bulk.bids):
+        name = users.get(item.user_id)
+        if name is not None:
+            bid_dict = _new_bid(item.auction_id, item.user_id, name, item.bid_amount)
+            bid_ids[index] = bid_dict['id']
+            requests.append((item.auction_id, item.user_id, name, bid_dict, item.max_amount))
+    outcomes = iter(await bid_engine.place_bids(requests))
+
+    items = []
+    # auction_id -> (bids recorded in order, result of the last accepted bid)
+    placed_by_auction: dict = {}
+    for index, item in enumerate(bulk.bids):
+        if item.user_id not in users:
+            items.append({"index": index, "auction_id": item.auction_id, "accepted": False, "reason": "unknown_user"})
+            continue
+        result = next(outcomes)
+        BID_RESULTS.labels("accepted" if result.accepted else result.reason).inc()
+        if not result.accepted:
+            items.append({
+                "index": index,
+                "auction_id": item.auction_id,
+                "accepted": False,
+                "reason": result.reason,
+                "min_bid": result.min_bid
+            })
+            continue
+
+        await _audit_bids(item.auction_id, item.user_id, users[item.user_id], item.max_amount, result)
+        if result.bids:
+            recorded, _ = placed_by_auction.get(item.auction_id, ([], None))
+            placed_by_auction[item.auction_id] = (recorded + result.bids, result)
+        items.append({
+            "index": index,
+            "auction_id": item.auction_id,
+            "accepted": True,
+            "leading": result.leading,
+            "current_highest_bid": result.current_highest_bid,
+            "bid": next((placed for placed in result.bids if placed['id'] == bid_ids[index]), None)
+        })
+
+    # One frame per auction however many of its bids were in the batch
+    await asyncio.gather(*[
+        manager.broadcast_to_auction(auction_id, _new_bid_message(recorded, result))
+        for auction_id, (recorded, result) in placed_by_auction.items()
+    ])
+
+    accepted = sum(1 for entry in items if entry["accepted"])
+    return {"accepted": accepted, "rejected": len(items) - accepted, "results": items}
+
+def _new_bid(auction_id: str, user_id: str, user_name: str, amount: float) -> dict:
+    """A new bid document, in the JSON form the bid engine takes."""
     bid = Bid(
-        id=bid_id,
+        id=str(uuid.uuid4()),
         auction_id=auction_id,
-        user_id=current_user.id,
-        user_name=current_user.name,
-        bid_amount=bid_data.bid_amount,
+        user_id=user_id,
+        user_name=user_name,
+        bid_amount=amount,
         created_at=datetime.now(timezone.utc)
     )
-    
     bid_dict = bid.model_dump()
+    # Travels through Redis as JSON; the engine restores the datetime on persist
     bid_dict['created_at'] = bid_dict['created_at'].isoformat()
-    await db.bids.insert_one(bid_dict)
-    
-    # Update auction
-    await db.auctions.update_one(
-        {"id": auction_id},
-        {
-            "$set": {
-                "current_highest_bid": bid_data.bid_amount,
-                "current_highest_bidder_id": current_user.id,
-                "current_highest_bidder_name": current_user.name
-            },
-            "$inc": {"total_bids": 1}
-        }
-    )
-    
-    # Create audit log
-    log_id = str(uuid.uuid4())
-    audit_log = AuditLog(
-        id=log_id,
-        auction_id=auction_id,
-        user_id=current_user.id,
-        message=f"{current_user.name} placed a bid of ${bid_data.bid_amount}"
-    )
-    log_dict = audit_log.model_dump()
-    log_dict['timestamp'] = log_dict['timestamp'].isoformat()
-    await db.audit_logs.insert_one(log_dict)
-    manager = ConnectionManager()
-    # Broadcast bid update via WebSocket
-    await manager.broadcast_to_auction(auction_id, {
+    return bid_dict
+
+async def _audit_bids(auction_id: str, user_id: str, user_name: str, max_amount: Optional[float], result: BidResult):
+    if max_amount is not None:
+        await audit_writer.log(auction_id, user_id, f"{user_name} set a maximum bid of ${max_amount}")
+    for placed in result.bids:
+        kind = "an automatic bid" if placed['proxy'] else "a bid"
+        await audit_writer.log(auction_id, placed['user_id'], f"{placed['user_name']} placed {kind} of ${placed['bid_amount']}")
+
+def _new_bid_message(bids: list, result: BidResult) -> dict:
+    """One new_bid frame for a run of recorded bids; maximums stay private."""
+    public_bids = [
+        {key: placed[key] for key in ("id", "user_name", "bid_amount", "proxy", "created_at")}
+        for placed in bids
+    ]
+    message = {
         "type": "new_bid",
-        "bid": {
-            "id": bid_id,
-            "user_name": current_user.name,
-            "bid_amount": bid_data.bid_amount,
-            "created_at": bid.created_at.isoformat()
-        },
+        "bid": public_bids[-1],
         "auction": {
-            "current_highest_bid": bid_data.bid_amount,
-            "current_highest_bidder_name": current_user.name,
-            "total_bids": auction.get('total_bids', 0) + 1
-        }
-    })
-    
-    return {
-        "message": "Bid placed successfully", 
-        "bid": {
-            "id": bid_id,
-            "auction_id": auction_id,
-            "user_id": current_user.id,
-            "user_name": current_user.name,
-            "bid_amount": bid_data.bid_amount,
-            "created_at": bid.created_at.isoformat()
+            "current_highest_bid": result.current_highest_bid,
+            "current_highest_bidder_name": result.current_highest_bidder_name,
+            "total_bids": result.total_bids
         }
     }
+    if len(public_bids) > 1:
+        message["bids"] = public_bids
+    if result.stats is not None:
+        message["stats"] = result.stats
+    return message
 
 @api_router.get("/{auction_id}/bids", response_model=List[Bid])
-async def get_auction_bids(auction_id: str):
-    bids = await db.bids.find({"auction_id": auction_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    
-    for bid in bids:
-        if isinstance(bid.get('created_at'), str):
-            bid['created_at'] = datetime.fromisoformat(bid['created_at'])
-    
-    return bids
+async def get_auction_bids(
+    auction_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    # Newest first, paged on (created_at, id) so equal timestamps never repeat or skip
+    query = {"auction_id": auction_id}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        created_at = cursor_datetime(created_at)
+        query = {"$and": [query, keyset_query("created_at", -1, created_at, last_id)]}
+
+    bids = await db.bids.find(query, BID_PROJECTION) \
+        .sort([("created_at", -1), ("id", -1)]) \
+        .limit(limit) \
+        .to_list(limit)
+
+    headers = {}
+    if len(bids) == limit:
+        last = bids[-1]
+        headers["X-Next-Cursor"] = encode_cursor([last['created_at'], last['id']])
+    # response_model still documents the shape; the body is encoded directly
+    return Response(content=dumps(bid_row.many(bids)), media_type="application/json", headers=headers)
+
+@api_router.get("/{auction_id}/stats")
+async def get_auction_stats(
+    auction_id: str,
+    top: int = Query(10, ge=1, le=100),
+    resolution: int = Query(STATS_BUCKET_SECONDS, ge=1)
+):
+    """Running bid statistics, read from Redis; ``resolution`` is the price series bucket width in seconds."""
+    if await auction_detail(auction_id) is None:
+        raise HTTPException(status_code=404, detail="Auction not found")
+    summary, series = await asyncio.gather(
+        auction_stats.summary(auction_id, top),
+        auction_stats.price_series(auction_id, resolution)
+    )
+    return {"auction_id": auction_id, **summary, "price_series": series}
+
+@api_router.get("/{auction_id}/bids/export")
+async def export_auction_bids(
+    auction_id: str,
+    format: BidExportFormat = BidExportFormat.NDJSON,
+    current_user: TokenUser = Depends(get_token_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can export bids")
+
+    # Oldest first; rows are written as each cursor batch arrives, so the full
+    # history is never held in memory
+    cursor = db.bids.find({"auction_id": auction_id}, {"_id": 0}) \
+        .sort([("created_at", 1), ("id", 1)]) \
+        .batch_size(BID_EXPORT_BATCH_SIZE)
+
+    if format == BidExportFormat.CSV:
+        return StreamingResponse(
+            _stream_bids_csv(cursor),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="bids-{auction_id}.csv"'}
+        )
+    return StreamingResponse(_stream_bids_ndjson(cursor), media_type="application/x-ndjson")
+
+async def _stream_bids_ndjson(cursor):
+    async for bid in cursor:
+        yield orjson.dumps(bid, option=JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+async def _stream_bids_csv(cursor):
+    buffer = io.StringIO()
+    fields = list(Bid.model_fields)
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for bid in cursor:
+        # Values read the same as in the NDJSON export
+        writer.writerow([csv_value(bid.get(field)) for field in fields])
+        # Flush roughly once per cursor batch
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
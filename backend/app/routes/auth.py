@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.db import db
-from app.core.utils import create_access_token, get_current_user, get_password_hash, verify_password
+from app.core.hashing import password_hasher
+from app.core.rate_limit import auth_rate_limit
+from app.core.utils import create_user_token, get_current_user
 from app.models.user import Token, User, UserCreate, UserLogin, UserResponse
 import uuid
 
@@ -10,7 +12,7 @@ api_router = APIRouter(
     tags=["auth"]
 )
 
-@api_router.post("/register", response_model=Token)
+@api_router.post("/register", response_model=Token, dependencies=[Depends(auth_rate_limit)])
 async def register(user_data: UserCreate):
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
@@ -21,15 +23,14 @@ async def register(user_data: UserCreate):
         id=user_id,
         name=user_data.name,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
         is_admin=False
     )
     
     user_dict = user.model_dump()
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
     await db.users.insert_one(user_dict)
     
-    access_token = create_access_token(data={"sub": user_id})
+    access_token = create_user_token(user)
     
     return Token(
         access_token=access_token,
@@ -37,14 +38,14 @@ async def register(user_data: UserCreate):
         user=UserResponse(id=user.id, name=user.name, email=user.email, is_admin=user.is_admin)
     )
 
-@api_router.post("/login", response_model=Token)
+@api_router.post("/login", response_model=Token, dependencies=[Depends(auth_rate_limit)])
 async def login(user_data: UserLogin):
     user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
-    if not user or not verify_password(user_data.password, user["password_hash"]):
+    if not user or not await password_hasher.verify(user_data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
     user_obj = User(**user)
-    access_token = create_access_token(data={"sub": user_obj.id})
+    access_token = create_user_token(user_obj)
     
     return Token(
         access_token=access_token,
@@ -1,19 +1,102 @@
 
+from functools import partial
+from typing import Optional
+
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.manager.connection_manager import ConnectionManager
+from app.config import STATS_FRAME_LEADERS, WS_MAX_SUBSCRIPTIONS, WS_SNAPSHOT_BIDS
+from app.db import db
+from app.manager.auction_stats import auction_stats
+from app.manager.connection_manager import manager
+from app.routes.auction import auction_detail
 
 router = APIRouter()
 
+async def build_snapshot(auction_id: str, seq: int) -> Optional[dict]:
+    """Auction state and recent bids as of event ``seq``, for a client that cannot resume."""
+    cached = await auction_detail(auction_id, min_seq=seq)
+    if cached is None:
+        return None
+    # The body may reflect a later event than asked for; the frame claims
+    # exactly what it shows, and the client drops the live events it covers
+    seq = cached.seq
+    bids = await manager.recent_bids(auction_id, WS_SNAPSHOT_BIDS, max_seq=seq)
+    if not bids and cached.data['total_bids']:
+        # The event stream has expired; fall back to the stored history
+        bids = await db.bids.find(
+            {"auction_id": auction_id},
+            {"_id": 0, "id": 1, "user_name": 1, "bid_amount": 1, "created_at": 1}
+        ).sort([("created_at", -1), ("id", -1)]).to_list(WS_SNAPSHOT_BIDS)
+    stats = await auction_stats.summary(auction_id, STATS_FRAME_LEADERS)
+    return {
+        "type": "snapshot",
+        "auction_id": auction_id,
+        "seq": seq,
+        "auction": cached.data,
+        "bids": bids,
+        "stats": stats
+    }
+
+def parse_since(value) -> Optional[int]:
+    if isinstance(value, int) and value >= 0:
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
 async def websocket_endpoint(websocket: WebSocket, auction_id: str):
     user_id = websocket.query_params.get("user_id", "anonymous")
-    manager = ConnectionManager()
-    await manager.connect(websocket, auction_id, user_id)
+    since = parse_since(websocket.query_params.get("since"))
+
+    snapshot = partial(build_snapshot, auction_id)
+    if not await manager.connect(websocket, auction_id, user_id, since=since, snapshot=snapshot):
+        return
     try:
         while True:
             _ = await websocket.receive_text()
             # Handle incoming messages here if needed
     except WebSocketDisconnect:
-        manager.disconnect(websocket, auction_id)
+        manager.disconnect(websocket)
+
+async def multiplexed_endpoint(websocket: WebSocket):
+    """One socket for many auctions, driven by subscribe/unsubscribe messages:
+
+        {"type": "subscribe", "auction_id": "...", "since": 12}
+        {"type": "unsubscribe", "auction_id": "..."}
+
+    Every frame sent back carries the auction_id it belongs to.
+    """
+    user_id = websocket.query_params.get("user_id", "anonymous")
+    conn = await manager.accept(websocket, user_id)
+    try:
+        while True:
+            try:
+                message = orjson.loads(await websocket.receive_text())
+                kind, auction_id = message.get("type"), message.get("auction_id")
+            except (orjson.JSONDecodeError, AttributeError):
+                kind = auction_id = None
+            if not isinstance(auction_id, str) or kind not in ("subscribe", "unsubscribe"):
+                manager.send(conn, {"type": "error", "detail": "Invalid message"})
+                continue
+
+            if kind == "unsubscribe":
+                manager.unsubscribe(conn, auction_id)
+                continue
+            if auction_id not in conn.auctions and len(conn.auctions) >= WS_MAX_SUBSCRIPTIONS:
+                manager.send(conn, {
+                    "type": "error",
+                    "auction_id": auction_id,
+                    "detail": f"At most {WS_MAX_SUBSCRIPTIONS} subscriptions per connection"
+                })
+                continue
+            snapshot = partial(build_snapshot, auction_id)
+            if not await manager.subscribe(conn, auction_id, parse_since(message.get("since")), snapshot):
+                manager.send(conn, manager.not_found(auction_id))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
 
-# Register the websocket route with the router
+# Register the websocket routes with the router
+router.add_api_websocket_route("/ws", multiplexed_endpoint)
 router.add_api_websocket_route("/ws/{auction_id}", websocket_endpoint)
@@ -0,0 +1,406 @@
+"""Run load and latency scenarios against a locally booted copy of the API.
+
+Boots the FastAPI app from app/main.py under uvicorn on a loopback port, seeds
+a dedicated data set and drives scripted scenarios over real HTTP and
+WebSocket connections. Results (throughput, p50/p95/p99 latency and
+bid-to-socket delivery latency) are written as JSON so runs can be compared
+between commits.
+
+    python benchmark.py [--backend memory|local] [--scenarios listing,bidding,fanout,login]
+                        [--output results.json]
+
+The memory backend swaps Mongo and Redis for mongomock-motor and fakeredis, so
+it needs no servers but measures the app rather than the databases. The local
+backend uses MONGO_URL / REDIS_HOST as configured; point it at throwaway
+servers, since the benchmark database is cleared and reseeded on every run.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import orjson
+import uvicorn
+import websockets
+
+SCENARIOS = ("listing", "bidding", "fanout", "login")
+
+# Shared by every seeded user so the login burst measures verification, not setup
+BENCH_PASSWORD = "bench-password"
+
+LISTING_QUERIES = [
+    {"status": status, "sort": sort, "limit": 50}
+    for status in ("ongoing", "upcoming", None)
+    for sort in ("ending_soon", "newest", "price_asc", "price_desc")
+]
+
+
+def install_backend(backend: str, db_name: str, rate_limit: bool):
+    """Point app.db at the chosen stores. Must run before anything imports the app."""
+    os.environ["DB_NAME"] = db_name
+    # Every simulated client shares one IP, so per-IP limits would cap the load
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if rate_limit else "false"
+    if backend != "memory":
+        return
+    import fakeredis
+    from mongomock_motor import AsyncMongoMockClient
+
+    import app.db
+    app.db.client = AsyncMongoMockClient(tz_aware=True)
+    app.db.db = app.db.client[db_name]
+    app.db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def summarize(samples: list) -> dict:
+    """Latency percentiles in milliseconds, nearest-rank."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3)
+    }
+
+
+class Recorder:
+    """Collects request latencies and status codes for one scenario."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self._started = time.perf_counter()
+
+    async def request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            return None
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status_code] += 1
+        return response
+
+    def result(self, **extra) -> dict:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(len(self.latencies) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": summarize(self.latencies),
+            **extra
+        }
+
+
+async def run_workers(total: int, concurrency: int, job):
+    """Call ``job(i)`` for i in range(total) with at most ``concurrency`` in flight."""
+    counter = itertools.count()
+
+    async def worker():
+        while (i := next(counter)) < total:
+            await job(i)
+
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, total))])
+
+
+class Viewer:
+    """A WebSocket client that timestamps every bid it is sent."""
+
+    def __init__(self, url: str, sent: dict):
+        self.url = url
+        self.sent = sent
+        self.delivery = []
+        self.received = 0
+        self._socket = None
+        self._task = None
+
+    async def connect(self):
+        self._socket = await websockets.connect(self.url, max_queue=None)
+        self._task = asyncio.create_task(self._receive())
+
+    async def close(self):
+        self._task.cancel()
+        await self._socket.close()
+
+    async def _receive(self):
+        try:
+            async for raw in self._socket:
+                arrived = time.perf_counter()
+                message = orjson.loads(raw)
+                if message.get("type") == "new_bid":
+                    bids = message.get("bids", [message["bid"]])
+                elif message.get("type") == "bids_batch":
+                    bids = message["bids"]
+                else:
+                    continue
+                for bid in bids:
+                    sent_at = self.sent.get(bid["bid_amount"])
+                    if sent_at is not None:
+                        self.received += 1
+                        self.delivery.append(arrived - sent_at)
+        except websockets.ConnectionClosed:
+            pass
+
+
+class Benchmark:
+    def __init__(self, args, base_url: str):
+        self.args = args
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://")
+        self.rng = random.Random(args.seed)
+        self.users = []
+        self.tokens = []
+        self.ongoing = []
+
+    async def seed(self):
+        """Reset the benchmark database and insert users and auctions directly."""
+        from app.core.utils import create_user_token, get_password_hash
+        from app.db import db
+        from app.manager.auction_scheduler import auction_scheduler
+        from app.models.user import User
+
+        for name in ("auctions", "bids", "users", "audit_logs", "settlements"):
+            await db[name].delete_many({})
+
+        password_hash = get_password_hash(BENCH_PASSWORD)
+        for i in range(self.args.users):
+            user = User(
+                id=str(uuid.uuid4()),
+                name=f"Bench User {i}",
+                email=f"bench{i}@example.com",
+                password_hash=password_hash
+            )
+            self.users.append(user)
+            self.tokens.append(create_user_token(user))
+        await db.users.insert_many([user.model_dump() for user in self.users])
+
+        now = datetime.now(timezone.utc)
+        auctions = []
+        for i in range(self.args.auctions):
+            status = ("ongoing", "ongoing", "upcoming")[i % 3]
+            if status == "ongoing":
+                start_time = now - timedelta(minutes=self.rng.randint(1, 600))
+            else:
+                start_time = now + timedelta(hours=self.rng.randint(1, 48))
+            starting_price = float(self.rng.randint(10, 5000))
+            auction_id = str(uuid.uuid4())
+            auctions.append({
+                "id": auction_id,
+                "item_id": auction_id,
+                "title": f"Bench Item {i}",
+                "description": "Benchmark auction",
+                "image_url": "https://example.com/item.jpg",
+                "starting_price": starting_price,
+                "current_price": starting_price,
+                "start_time": start_time,
+                "end_time": max(start_time, now) + timedelta(hours=self.rng.randint(2, 72)),
+                "current_highest_bid": None,
+                "current_highest_bidder_id": None,
+                "current_highest_bidder_name": None,
+                "status": status,
+                "total_bids": 0
+            })
+            if status == "ongoing":
+                self.ongoing.append(auction_id)
+        await db.auctions.insert_many(auctions)
+        for auction in auctions:
+            auction_scheduler.schedule(auction)
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.args.concurrency, max_keepalive_connections=self.args.concurrency)
+        return httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30)
+
+    async def listing(self) -> dict:
+        """Concurrent listing page reads across the status/sort combinations."""
+        queries = [self.rng.choice(LISTING_QUERIES) for _ in range(self.args.requests)]
+        recorder = Recorder()
+        async with self.client() as client:
+            async def job(i):
+                params = {key: value for key, value in queries[i].items() if value is not None}
+                await recorder.request(client, "GET", "/api/auctions/", params=params)
+            await run_workers(self.args.requests, self.args.concurrency, job)
+        return recorder.result()
+
+    async def bidding(self) -> dict:
+        """Concurrent bidders racing on one auction, watched by a single viewer."""
+        auction_id = self.ongoing[0]
+        sent = {}
+        viewer = Viewer(f"{self.ws_url}/ws/{auction_id}?user_id=bench-viewer", sent)
+        await viewer.connect()
+
+        # Strictly increasing amounts, so most bids win and each is identifiable on the socket
+        amounts = itertools.count(100000)
+        recorder = Recorder()
+        async with self.client() as client:
+            async def job(i):
+                amount = float(next(amounts))
+                sent[amount] = time.perf_counter()
+                await recorder.request(
+                    client, "POST", f"/api/auctions/{auction_id}/bid",
+                    json={"bid_amount": amount},
+                    headers={"Authorization": f"Bearer {self.tokens[i % len(self.tokens)]}"}
+                )
+            await run_workers(self.args.bids, self.args.concurrency, job)
+
+        await asyncio.sleep(self.args.settle)
+        await viewer.close()
+        # statuses separate accepted bids (200) from ones overtaken in flight (400)
+        return recorder.result(
+            delivered=viewer.received,
+            delivery_latency_ms=summarize(viewer.delivery)
+        )
+
+    async def fanout(self) -> dict:
+        """One bidder, many viewers: how long until every socket sees each bid."""
+        auction_id = self.ongoing[1 % len(self.ongoing)]
+        sent = {}
+        viewers = [
+            Viewer(f"{self.ws_url}/ws/{auction_id}?user_id=bench-viewer-{i}", sent)
+            for i in range(self.args.viewers)
+        ]
+        connect_started = time.perf_counter()
+        await asyncio.gather(*[viewer.connect() for viewer in viewers])
+        connect_seconds = time.perf_counter() - connect_started
+
+        recorder = Recorder()
+        headers = {"Authorization": f"Bearer {self.tokens[0]}"}
+        async with self.client() as client:
+            for i in range(self.args.fanout_bids):
+                amount = float(200000 + i)
+                sent[amount] = time.perf_counter()
+                await recorder.request(
+                    client, "POST", f"/api/auctions/{auction_id}/bid",
+                    json={"bid_amount": amount}, headers=headers
+                )
+                await asyncio.sleep(self.args.bid_interval)
+
+        await asyncio.sleep(self.args.settle)
+        await asyncio.gather(*[viewer.close() for viewer in viewers])
+        delivery = [sample for viewer in viewers for sample in viewer.delivery]
+        expected = self.args.viewers * self.args.fanout_bids
+        received = sum(viewer.received for viewer in viewers)
+        return recorder.result(
+            viewers=self.args.viewers,
+            connect_s=round(connect_seconds, 3),
+            delivered=received,
+            delivery_ratio=round(received / expected, 4) if expected else 1.0,
+            delivery_latency_ms=summarize(delivery)
+        )
+
+    async def login(self) -> dict:
+        """A burst of concurrent logins, each a bcrypt verification."""
+        recorder = Recorder()
+        async with self.client() as client:
+            async def job(i):
+                user = self.users[i % len(self.users)]
+                await recorder.request(
+                    client, "POST", "/api/auth/login",
+                    json={"email": user.email, "password": BENCH_PASSWORD}
+                )
+            await run_workers(self.args.logins, self.args.concurrency, job)
+        return recorder.result()
+
+
+async def run(args) -> dict:
+    install_backend(args.backend, args.db_name, args.rate_limit)
+    from app.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws="websockets"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        if serve_task.done():
+            serve_task.result()
+        await asyncio.sleep(0.05)
+
+    results = {}
+    try:
+        bench = Benchmark(args, f"http://127.0.0.1:{port}")
+        await bench.seed()
+        for name in args.scenarios:
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = await getattr(bench, name)()
+    finally:
+        server.should_exit = True
+        await serve_task
+
+    return {
+        "commit": current_commit(),
+        "backend": args.backend,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "scenarios")},
+        "scenarios": results
+    }
+
+
+def parse_scenarios(value: str) -> list:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("memory", "local"), default="memory")
+    parser.add_argument("--db-name", default="auction_bench")
+    parser.add_argument("--scenarios", type=parse_scenarios, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limit", action="store_true", help="keep admission control on (off by default)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--auctions", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="listing requests")
+    parser.add_argument("--bids", type=int, default=1000, help="bids in the bidding war")
+    parser.add_argument("--viewers", type=int, default=200, help="sockets in the fan-out scenario")
+    parser.add_argument("--fanout-bids", type=int, default=50)
+    parser.add_argument("--bid-interval", type=float, default=0.02, help="seconds between fan-out bids")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to wait for late socket frames")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,105 @@
+"""Rewrite legacy documents in place.
+
+Older records stored every timestamp as an ISO string. This converts them to
+native BSON datetimes in batches, backfills auctions.current_price, makes
+sure the indexes exist and drops the ones they replaced. Safe to run more
+than once.
+
+    python migrate_data.py [--batch-size 1000]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from app.db import client, db, ensure_indexes
+
+# Timestamp fields stored as strings by earlier versions, per collection
+DATETIME_FIELDS = {
+    "auctions": ["start_time", "end_time"],
+    "bids": ["created_at"],
+    "users": ["created_at"],
+    "audit_logs": ["timestamp"],
+}
+
+# Indexes superseded by ones ensure_indexes() creates, per collection
+RETIRED_INDEXES = {
+    # Covered by (auction_id, created_at, id)
+    "bids": ["auction_id_1_created_at_-1"],
+}
+
+INDEX_NOT_FOUND = 27
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_datetimes(collection_name: str, fields: list, batch_size: int) -> int:
+    collection = db[collection_name]
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+
+    migrated = 0
+    batch = []
+    async for doc in collection.find(query, projection).batch_size(batch_size):
+        updates = {
+            field: parse_timestamp(doc[field])
+            for field in fields
+            if isinstance(doc.get(field), str)
+        }
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+        if len(batch) >= batch_size:
+            await collection.bulk_write(batch, ordered=False)
+            migrated += len(batch)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        migrated += len(batch)
+    return migrated
+
+
+async def backfill_current_price() -> int:
+    result = await db.auctions.update_many(
+        {"current_price": {"$exists": False}},
+        [{"$set": {"current_price": {"$ifNull": ["$current_highest_bid", "$starting_price"]}}}]
+    )
+    return result.modified_count
+
+
+async def drop_retired_indexes() -> int:
+    dropped = 0
+    for collection_name, names in RETIRED_INDEXES.items():
+        for name in names:
+            try:
+                await db[collection_name].drop_index(name)
+                dropped += 1
+            except OperationFailure as e:
+                if e.code != INDEX_NOT_FOUND:
+                    raise
+    return dropped
+
+
+async def migrate(batch_size: int):
+    for collection_name, fields in DATETIME_FIELDS.items():
+        migrated = await migrate_datetimes(collection_name, fields, batch_size)
+        print(f"{collection_name}: converted {migrated} documents")
+
+    backfilled = await backfill_current_price()
+    print(f"auctions: backfilled current_price on {backfilled} documents")
+
+    await ensure_indexes()
+    print(f"Indexes ensured; dropped {await drop_retired_indexes()} retired indexes")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size))
@@ -1,4 +1,15 @@
+"""Seed the database with demo data, or with a large synthetic data set.
+
+    python seed_data.py
+    python seed_data.py --scale [--users 10000] [--auctions 10000] [--bids-per-auction 200] [--seed 1]
+
+The default run creates the test accounts and six sample auctions. Scale mode
+generates users, auctions across every status and realistic bid histories,
+written with large unordered insert_many batches from concurrent writers.
+"""
+import argparse
 import asyncio
+import random
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
@@ -14,17 +25,19 @@ load_dotenv(ROOT_DIR / '.env')
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 async def seed_database():
     print("Seeding database...")
     
     # Clear existing data
+    await invalidate_cached_users()
     await db.users.delete_many({})
     await db.auctions.delete_many({})
     await db.bids.delete_many({})
     await db.audit_logs.delete_many({})
+    await reset_redis()
     
     # Create admin user
     admin_id = str(uuid.uuid4())
@@ -34,7 +47,7 @@ async def seed_database():
         "email": "admin@auction.com",
         "password_hash": pwd_context.hash("admin123"),
         "is_admin": True,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     await db.users.insert_one(admin_user)
     print(f"Created admin user: admin@auction.com / admin123")
@@ -47,7 +60,7 @@ async def seed_database():
         "email": "john@example.com",
         "password_hash": pwd_context.hash("password123"),
         "is_admin": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     await db.users.insert_one(user1)
     print(f"Created user: john@example.com / password123")
@@ -59,7 +72,7 @@ async def seed_database():
         "email": "jane@example.com",
         "password_hash": pwd_context.hash("password123"),
         "is_admin": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     await db.users.insert_one(user2)
     print(f"Created user: jane@example.com / password123")
@@ -137,8 +150,9 @@ async def seed_database():
             "description": auction_data['description'],
             "image_url": auction_data['image_url'],
             "starting_price": auction_data['starting_price'],
-            "start_time": auction_data['start_time'].isoformat(),
-            "end_time": auction_data['end_time'].isoformat(),
+            "current_price": auction_data['starting_price'],
+            "start_time": auction_data['start_time'],
+            "end_time": auction_data['end_time'],
             "current_highest_bid": None,
             "current_highest_bidder_id": None,
             "current_highest_bidder_name": None,
@@ -171,7 +185,7 @@ async def seed_database():
                     "user_id": bidder['id'],
                     "user_name": bidder['name'],
                     "bid_amount": current_bid,
-                    "created_at": (datetime.now(timezone.utc) - timedelta(minutes=30-i*10)).isoformat()
+                    "created_at": datetime.now(timezone.utc) - timedelta(minutes=30-i*10)
                 }
                 await db.bids.insert_one(bid)
                 
@@ -181,6 +195,7 @@ async def seed_database():
                     {
                         "$set": {
                             "current_highest_bid": current_bid,
+                            "current_price": current_bid,
                             "current_highest_bidder_id": bidder['id'],
                             "current_highest_bidder_name": bidder['name'],
                             "total_bids": i + 1
@@ -199,5 +214,258 @@ async def seed_database():
     for _, status, title in created_auctions:
         print(f"  [{status.upper()}] {title}")
 
+
+# Synthetic users all share this password, so bcrypt runs once per seed
+SCALE_PASSWORD = "password123"
+
+SCALE_ITEMS = [
+    ("Vintage Wristwatch", "https://images.unsplash.com/photo-1629582183727-86788aeaef34?crop=entropy&cs=srgb&fm=jpg&q=85"),
+    ("Classic Car", "https://images.unsplash.com/photo-1660726343043-9733d701a71f?crop=entropy&cs=srgb&fm=jpg&q=85"),
+    ("Designer Handbag", "https://images.unsplash.com/photo-1712622083122-944eea9d23e1?crop=entropy&cs=srgb&fm=jpg&q=85"),
+    ("Vinyl Record Collection", "https://images.unsplash.com/photo-1740616968774-926b4e6cdef2?crop=entropy&cs=srgb&fm=jpg&q=85"),
+    ("Antique Rug", "https://images.unsplash.com/photo-1600166898405-da9535204843?crop=entropy&cs=srgb&fm=jpg&q=85"),
+    ("Camera Kit", "https://images.unsplash.com/photo-1606478224398-f67c4c8fbf0f?crop=entropy&cs=srgb&fm=jpg&q=85"),
+]
+
+
+class BatchWriter:
+    """Concurrent unordered insert_many writers fed through a bounded queue."""
+
+    def __init__(self, batch_size: int, concurrency: int):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.written = {}
+        self._queue = asyncio.Queue(maxsize=concurrency * 2)
+        self._buffers = {}
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def add(self, collection: str, doc: dict):
+        buffer = self._buffers.setdefault(collection, [])
+        buffer.append(doc)
+        if len(buffer) >= self.batch_size:
+            self._buffers[collection] = []
+            # Blocks while the writers are behind, which bounds memory
+            await self._queue.put((collection, buffer))
+
+    async def close(self):
+        for collection, buffer in self._buffers.items():
+            if buffer:
+                await self._queue.put((collection, buffer))
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+
+    async def _run(self):
+        while (item := await self._queue.get()) is not None:
+            collection, docs = item
+            await db[collection].insert_many(docs, ordered=False)
+            self.written[collection] = self.written.get(collection, 0) + len(docs)
+
+
+def seeded_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def bid_history(rng: random.Random, auction: dict, bidders: list, mean_bids: int, now: datetime) -> list:
+    """A plausible bid curve: prices climb in shrinking steps, activity bunches toward the close."""
+    count = min(int(rng.expovariate(1 / mean_bids)), mean_bids * 5) if mean_bids else 0
+    if not count:
+        return []
+
+    window_start = auction['start_time']
+    window = (min(auction['end_time'], now) - window_start).total_seconds()
+    # u ** (1/3) skews times toward the end of the window, like late sniping
+    offsets = sorted(window * rng.random() ** (1 / 3) for _ in range(count))
+
+    # A small circle of regulars does most of the bidding on any one auction
+    circle = rng.sample(bidders, min(len(bidders), rng.randint(2, 15)))
+    price = auction['starting_price']
+    previous = None
+    bids = []
+    for i, offset in enumerate(offsets):
+        step = price * rng.uniform(0.005, 0.08) * (1 - i / (count + 1)) + 1
+        price = round(price + step, 2)
+        bidder = rng.choice([user for user in circle if user is not previous] or circle)
+        previous = bidder
+        bids.append({
+            "id": seeded_uuid(rng),
+            "auction_id": auction['id'],
+            "user_id": bidder['id'],
+            "user_name": bidder['name'],
+            "bid_amount": price,
+            "created_at": window_start + timedelta(seconds=offset)
+        })
+    return bids
+
+
+# Redis state the app keeps per auction (hot bid state, event streams and seq
+# counters, stats), cached responses, the bid outbox, idempotency answers,
+# rate limit buckets and scheduler locks. Left behind, it would contradict the
+# freshly seeded collections, and a repeated --seed reuses the same auction ids.
+APP_REDIS_PATTERNS = ("auction:*", "cache:*", "bids:outbox", "idempotency:*", "ratelimit:*", "lock:auction:*")
+
+
+async def reset_redis() -> int:
+    """Delete the app's Redis keys; returns how many were removed."""
+    from app.db import redis_client
+
+    deleted = 0
+    for pattern in APP_REDIS_PATTERNS:
+        keys = []
+        async for key in redis_client.scan_iter(match=pattern, count=1000):
+            keys.append(key)
+            if len(keys) >= 1000:
+                deleted += await redis_client.unlink(*keys)
+                keys = []
+        if keys:
+            deleted += await redis_client.unlink(*keys)
+    return deleted
+
+
+INVALIDATION_BATCH_SIZE = 1000
+
+
+async def invalidate_cached_users():
+    """Have running app workers drop their cached copies of the users about to be deleted.
+
+    A repeated --seed recreates the same user ids, which would otherwise keep
+    resolving to the old records until their cache entries expire.
+    """
+    from app.core.user_cache import invalidate_users
+
+    user_ids = []
+    async for user in db.users.find({}, {"_id": 0, "id": 1}).batch_size(INVALIDATION_BATCH_SIZE):
+        user_ids.append(user["id"])
+        if len(user_ids) >= INVALIDATION_BATCH_SIZE:
+            await invalidate_users(user_ids)
+            user_ids = []
+    if user_ids:
+        await invalidate_users(user_ids)
+
+
+async def seed_scale(users: int, auctions: int, bids_per_auction: int, seed: int, batch_size: int, concurrency: int):
+    # Indexes are rebuilt once the data is in, which beats maintaining them per insert
+    from app.db import ensure_indexes
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    started = asyncio.get_running_loop().time()
+    print(f"Seeding {users} users, {auctions} auctions, ~{bids_per_auction} bids per auction (seed {seed})...")
+
+    await invalidate_cached_users()
+    for name in ("users", "auctions", "bids", "audit_logs", "settlements"):
+        await db.drop_collection(name)
+    print(f"Cleared {await reset_redis()} Redis keys")
+
+    writer = BatchWriter(batch_size, concurrency)
+    writer.start()
+
+    password_hash = pwd_context.hash(SCALE_PASSWORD)
+    await writer.add("users", {
+        "id": seeded_uuid(rng),
+        "name": "Admin User",
+        "email": "admin@auction.com",
+        "password_hash": pwd_context.hash("admin123"),
+        "is_admin": True,
+        "created_at": now
+    })
+    bidders = []
+    for i in range(users):
+        user = {
+            "id": seeded_uuid(rng),
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "password_hash": password_hash,
+            "is_admin": False,
+            "created_at": now - timedelta(days=rng.randint(0, 365))
+        }
+        bidders.append({"id": user['id'], "name": user['name']})
+        await writer.add("users", user)
+
+    for i in range(auctions):
+        title, image_url = rng.choice(SCALE_ITEMS)
+        auction_id = seeded_uuid(rng)
+        # Start times spread over the last 30 days and the next 7
+        start_time = now + timedelta(minutes=rng.randint(-30 * 24 * 60, 7 * 24 * 60))
+        end_time = start_time + timedelta(minutes=rng.randint(60, 7 * 24 * 60))
+        if now < start_time:
+            status = 'upcoming'
+        elif now > end_time:
+            status = 'completed'
+        else:
+            status = 'ongoing'
+        starting_price = float(round(rng.lognormvariate(6, 1.2), 2))
+        auction = {
+            "id": auction_id,
+            "item_id": auction_id,
+            "title": f"{title} #{i}",
+            "description": f"Synthetic {title.lower()} listing for load testing.",
+            "image_url": image_url,
+            "starting_price": starting_price,
+            "current_price": starting_price,
+            "start_time": start_time,
+            "end_time": end_time,
+            "current_highest_bid": None,
+            "current_highest_bidder_id": None,
+            "current_highest_bidder_name": None,
+            "status": status,
+            "total_bids": 0
+        }
+
+        bids = bid_history(rng, auction, bidders, bids_per_auction, now) if status != 'upcoming' and bidders else []
+        for bid in bids:
+            await writer.add("bids", bid)
+        if bids:
+            last = bids[-1]
+            auction.update({
+                "current_highest_bid": last['bid_amount'],
+                "current_price": last['bid_amount'],
+                "current_highest_bidder_id": last['user_id'],
+                "current_highest_bidder_name": last['user_name'],
+                "total_bids": len(bids)
+            })
+        await writer.add("auctions", auction)
+
+        if status == 'completed':
+            await writer.add("settlements", {
+                "id": seeded_uuid(rng),
+                "auction_id": auction_id,
+                "winner_id": auction['current_highest_bidder_id'],
+                "winner_name": auction['current_highest_bidder_name'],
+                "final_price": auction['current_highest_bid'],
+                "total_bids": auction['total_bids'],
+                "settled_at": end_time
+            })
+
+    await writer.close()
+    for name, count in writer.written.items():
+        print(f"  {name}: {count}")
+
+    print("Building indexes...")
+    await ensure_indexes()
+    elapsed = asyncio.get_running_loop().time() - started
+    print(f"\n=== Seeded in {elapsed:.1f}s ===")
+    print("  Admin: admin@auction.com / admin123")
+    print(f"  Users: user0@example.com .. user{users - 1}@example.com / {SCALE_PASSWORD}")
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", action="store_true", help="generate a synthetic data set instead of the demo data")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--auctions", type=int, default=10000)
+    parser.add_argument("--bids-per-auction", type=int, default=200, help="mean; actual counts vary per auction")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel insert_many writers")
+    args = parser.parse_args()
+
+    if args.scale:
+        asyncio.run(seed_scale(
+            args.users, args.auctions, args.bids_per_auction, args.seed, args.batch_size, args.concurrency
+        ))
+    else:
+        asyncio.run(seed_database())
@@ -0,0 +1,19 @@
+import axios from 'axios';
+
+const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+
+export const AUCTION_PAGE_SIZE = 50;
+
+// One page of the listing; pass the returned nextCursor back to get the next one
+export async function fetchAuctionPage(params = {}, cursor = null) {
+  const response = await axios.get(`${API}/auctions/`, {
+    params: { limit: AUCTION_PAGE_SIZE, ...params, ...(cursor ? { cursor } : {}) }
+  });
+  return { auctions: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+}
+
+// Refresh the first page in place, keeping any rows loaded further down
+export function mergeFirstPage(loaded, firstPage) {
+  const fresh = new Set(firstPage.map((auction) => auction.id));
+  return [...firstPage, ...loaded.slice(firstPage.length).filter((auction) => !fresh.has(auction.id))];
+}
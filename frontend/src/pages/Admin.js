@@ -10,6 +10,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '.
 import { Badge } from '../components/ui/badge';
 import { ArrowLeft, Plus, Calendar as CalendarIcon } from 'lucide-react';
 import { toast } from 'sonner';
+import { fetchAuctionPage } from '../lib/auctions';
 import axios from 'axios';
 import dayjs from 'dayjs';
 
@@ -18,6 +19,8 @@ const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 export default function Admin() {
   const [auctions, setAuctions] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [dialogOpen, setDialogOpen] = useState(false);
   const { user } = useAuth();
   const navigate = useNavigate();
@@ -42,8 +45,9 @@ export default function Admin() {
 
   const loadAuctions = async () => {
     try {
-      const response = await axios.get(`${API}/auctions`);
-      setAuctions(response.data);
+      const page = await fetchAuctionPage();
+      setAuctions(page.auctions);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to load auctions:', error);
       toast.error('Failed to load auctions');
@@ -52,6 +56,23 @@ export default function Admin() {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchAuctionPage({}, nextCursor);
+      setAuctions((loaded) => {
+        const seen = new Set(loaded.map((auction) => auction.id));
+        return [...loaded, ...page.auctions.filter((auction) => !seen.has(auction.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load more auctions:', error);
+      toast.error('Failed to load more auctions');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     
@@ -264,6 +285,19 @@ export default function Admin() {
             </Table>
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="mt-6 flex justify-center">
+            <Button
+              data-testid="admin-load-more-button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              variant="outline"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </main>
     </div>
   );
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../hooks/useAuth';
 import useWebSocket from 'react-use-websocket';
@@ -21,11 +21,25 @@ export default function AuctionDetail() {
   const { user } = useAuth();
   const [auction, setAuction] = useState(null);
   const [bids, setBids] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  // Sequence number of the last event applied; sent on reconnect to resume
+  const lastSeq = useRef(null);
 
-  // WebSocket connection
+  useEffect(() => {
+    lastSeq.current = null;
+    setLoading(true);
+  }, [id]);
+
+  // Called on every (re)connect, so a dropped socket picks up where it left off
+  const getSocketUrl = useCallback(() => {
+    const since = lastSeq.current === null ? '' : `&since=${lastSeq.current}`;
+    return Promise.resolve(`${WS_URL}/ws/${id}?user_id=${user?.id || 'anonymous'}${since}`);
+  }, [id, user?.id]);
+
+  // WebSocket connection; the server opens with a snapshot or the missed events
   const { lastJsonMessage } = useWebSocket(
-    `${WS_URL}/ws/${id}?user_id=${user?.id || 'anonymous'}`,
+    getSocketUrl,
     {
       shouldReconnect: () => true,
       reconnectInterval: 3000,
@@ -35,11 +49,6 @@ export default function AuctionDetail() {
     }
   );
 
-  useEffect(() => {
-    loadAuction();
-    loadBids();
-  }, [id]);
-
   useEffect(() => {
     if (lastJsonMessage) {
       handleWebSocketMessage(lastJsonMessage);
@@ -47,6 +56,30 @@ export default function AuctionDetail() {
   }, [lastJsonMessage]);
 
   const handleWebSocketMessage = (message) => {
+    if (message.type === 'error') {
+      toast.error(message.detail || 'Failed to load auction');
+      navigate('/dashboard');
+      return;
+    }
+    if (message.type === 'snapshot') {
+      lastSeq.current = message.seq;
+      setAuction(message.auction);
+      setBids(message.bids);
+      setStats(message.stats);
+      setLoading(false);
+      return;
+    }
+    if (message.seq !== undefined) {
+      // Already covered by the snapshot or an earlier frame
+      if (lastSeq.current !== null && message.seq <= lastSeq.current) {
+        return;
+      }
+      lastSeq.current = message.seq;
+    }
+    if (message.stats) {
+      setStats(message.stats);
+    }
+
     if (message.type === 'new_bid') {
       // Update auction data
       if (message.auction) {
@@ -58,32 +91,31 @@ export default function AuctionDetail() {
         }));
       }
       
-      // Add new bid to feed
-      if (message.bid) {
+      // Add new bid to feed; competing maximum bids can produce several at once
+      if (message.bids) {
+        setBids(prev => [...[...message.bids].reverse(), ...prev]);
+      } else if (message.bid) {
         setBids(prev => [message.bid, ...prev]);
       }
-    }
-  };
-
-  const loadAuction = async () => {
-    try {
-      const response = await axios.get(`${API}/auctions/${id}`);
-      setAuction(response.data);
-    } catch (error) {
-      console.error('Failed to load auction:', error);
-      toast.error('Failed to load auction');
-      navigate('/dashboard');
-    } finally {
-      setLoading(false);
-    }
-  };
-
-  const loadBids = async () => {
-    try {
-      const response = await axios.get(`${API}/auctions/${id}/bids`);
-      setBids(response.data);
-    } catch (error) {
-      console.error('Failed to load bids:', error);
+    } else if (message.type === 'bids_batch') {
+      // Several bids from one server tick, oldest first
+      setAuction(prev => ({
+        ...prev,
+        current_highest_bid: message.auction.current_highest_bid,
+        current_highest_bidder_name: message.auction.current_highest_bidder_name,
+        total_bids: message.auction.total_bids
+      }));
+      setBids(prev => [...[...message.bids].reverse(), ...prev]);
+    } else if (message.type === 'auction_started') {
+      setAuction(prev => ({ ...prev, status: message.status }));
+    } else if (message.type === 'auction_closed') {
+      setAuction(prev => ({
+        ...prev,
+        status: message.status,
+        current_highest_bid: message.final_price,
+        current_highest_bidder_name: message.winner_name,
+        total_bids: message.total_bids
+      }));
     }
   };
 
@@ -190,6 +222,18 @@ export default function AuctionDetail() {
                     {auction.total_bids}
                   </div>
                 </div>
+                {stats && (
+                  <>
+                    <div>
+                      <div className="text-xs text-muted-foreground mb-1">Bidders</div>
+                      <div className="text-lg font-semibold" data-testid="auction-detail-bidders">{stats.unique_bidders}</div>
+                    </div>
+                    <div>
+                      <div className="text-xs text-muted-foreground mb-1">Bids / min</div>
+                      <div className="text-lg font-numeric font-semibold">{stats.bids_per_minute.toFixed(1)}</div>
+                    </div>
+                  </>
+                )}
               </div>
             </div>
           </div>
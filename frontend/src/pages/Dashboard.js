@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../hooks/useAuth';
 import { AuctionCard } from '../components/AuctionCard';
@@ -6,10 +6,8 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from '../components/ui/tabs'
 import { Input } from '../components/ui/input';
 import { Button } from '../components/ui/button';
 import { Gavel, Search, LogOut, Plus, Shield } from 'lucide-react';
-import axios from 'axios';
 import { toast } from 'sonner';
-
-const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+import { fetchAuctionPage, mergeFirstPage } from '../lib/auctions';
 
 export default function Dashboard() {
   const [auctions, setAuctions] = useState([]);
@@ -17,28 +15,73 @@ export default function Dashboard() {
   const [activeTab, setActiveTab] = useState('ongoing');
   const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Which tab the rows on screen belong to, and how many pages of it are loaded
+  const listing = useRef({ status: activeTab, pages: 1 });
   const { user, logout } = useAuth();
   const navigate = useNavigate();
 
   useEffect(() => {
-    loadAuctions();
-    const interval = setInterval(loadAuctions, 10000); // Refresh every 10s
-    return () => clearInterval(interval);
-  }, []);
+    let active = true;
+    listing.current = { status: activeTab, pages: 1 };
+    setAuctions([]);
+    setNextCursor(null);
+    setLoading(true);
+
+    // Poll only the first page; pages loaded on demand are left as they are
+    const refresh = async () => {
+      try {
+        // Filtered on the server so a long tail of other lots cannot crowd this tab out
+        const page = await fetchAuctionPage({ status: activeTab });
+        if (!active) {
+          return;
+        }
+        setAuctions((loaded) => mergeFirstPage(loaded, page.auctions));
+        if (listing.current.pages === 1) {
+          setNextCursor(page.nextCursor);
+        }
+      } catch (error) {
+        console.error('Failed to load auctions:', error);
+        toast.error('Failed to load auctions');
+      } finally {
+        if (active) {
+          setLoading(false);
+        }
+      }
+    };
+
+    refresh();
+    const interval = setInterval(refresh, 10000); // Refresh every 10s
+    return () => {
+      active = false;
+      clearInterval(interval);
+    };
+  }, [activeTab]);
 
   useEffect(() => {
     filterAuctions();
   }, [auctions, activeTab, searchQuery]);
 
-  const loadAuctions = async () => {
+  const loadMore = async () => {
+    const status = activeTab;
+    setLoadingMore(true);
     try {
-      const response = await axios.get(`${API}/auctions`);
-      setAuctions(response.data);
+      const page = await fetchAuctionPage({ status }, nextCursor);
+      if (listing.current.status !== status) {
+        return;
+      }
+      listing.current.pages += 1;
+      setAuctions((loaded) => {
+        const seen = new Set(loaded.map((auction) => auction.id));
+        return [...loaded, ...page.auctions.filter((auction) => !seen.has(auction.id))];
+      });
+      setNextCursor(page.nextCursor);
     } catch (error) {
-      console.error('Failed to load auctions:', error);
-      toast.error('Failed to load auctions');
+      console.error('Failed to load more auctions:', error);
+      toast.error('Failed to load more auctions');
     } finally {
-      setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -201,6 +244,19 @@ export default function Dashboard() {
             )}
           </TabsContent>
         </Tabs>
+
+        {!loading && nextCursor && (
+          <div className="mt-8 flex justify-center">
+            <Button
+              data-testid="load-more-auctions-button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              variant="outline"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </main>
     </div>
   );
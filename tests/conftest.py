@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app package lives in backend/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
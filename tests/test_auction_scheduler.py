@@ -0,0 +1,190 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from mongomock_motor import AsyncMongoMockClient
+
+from app.manager import audit_writer as writer_module
+from app.manager import auction_scheduler as scheduler_module
+from app.manager import bid_engine as engine_module
+from app.manager.auction_scheduler import END, START, AuctionScheduler
+from app.manager.bid_engine import BidEngine
+from app.models.auction import AuctionStatus
+
+pytestmark = pytest.mark.anyio
+
+AUCTION_ID = "a1"
+
+
+class RecordingManager:
+    def __init__(self):
+        self.broadcasts = []
+
+    async def broadcast_to_auction(self, auction_id: str, message: dict):
+        self.broadcasts.append(message)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(engine_module, "redis_client", client)
+    monkeypatch.setattr(scheduler_module, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = AsyncMongoMockClient(tz_aware=True)["test"]
+    for module in (engine_module, scheduler_module, writer_module):
+        monkeypatch.setattr(module, "db", database)
+    return database
+
+
+@pytest.fixture
+def engine(redis, db, monkeypatch):
+    engine = BidEngine()
+    monkeypatch.setattr(scheduler_module, "bid_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    manager = RecordingManager()
+    monkeypatch.setattr(scheduler_module, "manager", manager)
+    return manager.broadcasts
+
+
+@pytest.fixture
+def scheduler(engine, broadcasts):
+    return AuctionScheduler()
+
+
+async def add_auction(db, status, starts_in, ends_in):
+    now = datetime.now(timezone.utc)
+    await db.auctions.insert_one({
+        "id": AUCTION_ID,
+        "starting_price": 100.0,
+        "current_price": 100.0,
+        "current_highest_bid": None,
+        "current_highest_bidder_id": None,
+        "current_highest_bidder_name": None,
+        "start_time": now + timedelta(seconds=starts_in),
+        "end_time": now + timedelta(seconds=ends_in),
+        "status": status,
+        "total_bids": 0
+    })
+
+
+async def bid(engine, user_id, amount):
+    document = {
+        "id": str(uuid.uuid4()),
+        "auction_id": AUCTION_ID,
+        "user_id": user_id,
+        "user_name": user_id.upper(),
+        "bid_amount": float(amount),
+        "proxy": False,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    return await engine.place_bid(AUCTION_ID, user_id, user_id.upper(), document)
+
+
+async def test_open_starts_auction_and_warms_bid_state(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.UPCOMING, starts_in=-1, ends_in=3600)
+
+    await scheduler._transition(AUCTION_ID, START)
+
+    assert (await db.auctions.find_one({"id": AUCTION_ID}))["status"] == AuctionStatus.ONGOING
+    assert await engine.current_state(AUCTION_ID) is not None
+    assert [message["type"] for message in broadcasts] == ["auction_started"]
+
+
+async def test_open_skips_auction_already_over(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.UPCOMING, starts_in=-7200, ends_in=-3600)
+
+    await scheduler._transition(AUCTION_ID, START)
+
+    assert (await db.auctions.find_one({"id": AUCTION_ID}))["status"] == AuctionStatus.UPCOMING
+    assert broadcasts == []
+
+
+async def test_close_settles_on_final_hot_state(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.ONGOING, starts_in=-3600, ends_in=3600)
+    await bid(engine, "a", 150)
+
+    # The bid is still on the outbox, so Mongo has not seen it yet
+    await scheduler._transition(AUCTION_ID, END)
+
+    settlement = await db.settlements.find_one({"auction_id": AUCTION_ID})
+    auction = await db.auctions.find_one({"id": AUCTION_ID})
+    assert (settlement["winner_id"], settlement["final_price"], settlement["total_bids"]) == ("a", 150.0, 1)
+    assert auction["status"] == AuctionStatus.COMPLETED
+    assert (auction["current_highest_bidder_id"], auction["current_highest_bid"]) == ("a", 150.0)
+    assert broadcasts[-1]["type"] == "auction_closed" and broadcasts[-1]["winner_name"] == "A"
+    assert await db.audit_logs.count_documents({"auction_id": AUCTION_ID}) == 1
+
+
+async def test_bid_racing_the_close_is_rejected(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.ONGOING, starts_in=-3600, ends_in=3600)
+    await bid(engine, "a", 150)
+
+    await scheduler._transition(AUCTION_ID, END)
+    late = await bid(engine, "late", 500)
+    while await engine._persist_batch():
+        pass
+
+    settlement = await db.settlements.find_one({"auction_id": AUCTION_ID})
+    auction = await db.auctions.find_one({"id": AUCTION_ID})
+    assert not late.accepted and late.reason == "inactive"
+    # Persisting the outbox afterwards cannot move the winner
+    assert auction["current_highest_bidder_id"] == settlement["winner_id"] == "a"
+    assert auction["current_highest_bid"] == settlement["final_price"] == 150.0
+
+
+async def test_close_without_bids(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.ONGOING, starts_in=-3600, ends_in=-1)
+
+    await scheduler._transition(AUCTION_ID, END)
+
+    settlement = await db.settlements.find_one({"auction_id": AUCTION_ID})
+    assert settlement["winner_id"] is None and settlement["total_bids"] == 0
+    assert await db.audit_logs.count_documents({}) == 0
+    assert broadcasts[-1]["type"] == "auction_closed"
+
+
+async def test_only_one_worker_runs_a_transition(engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.ONGOING, starts_in=-3600, ends_in=3600)
+    await bid(engine, "a", 150)
+
+    await asyncio.gather(*[AuctionScheduler()._transition(AUCTION_ID, END) for _ in range(3)])
+
+    assert await db.settlements.count_documents({}) == 1
+    assert [message["type"] for message in broadcasts] == ["auction_closed"]
+
+
+async def test_closing_twice_is_a_no_op(scheduler, engine, db, broadcasts):
+    await add_auction(db, AuctionStatus.ONGOING, starts_in=-3600, ends_in=3600)
+
+    await scheduler._close(AUCTION_ID)
+    await scheduler._close(AUCTION_ID)
+
+    assert await db.settlements.count_documents({}) == 1
+    assert len(broadcasts) == 1
+
+
+async def test_schedule_queues_pending_transitions_within_horizon(scheduler):
+    now = datetime.now(timezone.utc)
+    scheduler.schedule({
+        "id": "soon", "status": AuctionStatus.UPCOMING,
+        "start_time": now, "end_time": now + timedelta(minutes=1)
+    })
+    scheduler.schedule({
+        "id": "later", "status": AuctionStatus.UPCOMING,
+        "start_time": now + timedelta(days=30), "end_time": now + timedelta(days=31)
+    })
+    scheduler.schedule({"id": "done", "status": AuctionStatus.COMPLETED, "start_time": now, "end_time": now})
+
+    assert sorted((auction_id, transition) for _, auction_id, transition in scheduler._heap) == [
+        ("soon", END), ("soon", START)
+    ]
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.manager import audit_writer as writer_module
+from app.manager.audit_writer import AuditWriter
+from app.models.audit import AuditLog
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = AsyncMongoMockClient(tz_aware=True)["test"]
+    monkeypatch.setattr(writer_module, "db", database)
+    monkeypatch.setattr(writer_module, "AUDIT_RETRY_BACKOFF", 0)
+    return database
+
+
+def flaky_insert(monkeypatch, failures: int):
+    """Make the first ``failures`` inserts raise; later ones go through."""
+    calls = []
+    real_insert = writer_module.insert_new
+
+    async def insert(collection, documents):
+        calls.append(len(documents))
+        if len(calls) <= failures:
+            raise RuntimeError("mongo unavailable")
+        await real_insert(collection, documents)
+
+    monkeypatch.setattr(writer_module, "insert_new", insert)
+    return calls
+
+
+def entries(count: int) -> list:
+    return [AuditLog(id=f"log-{i}", auction_id="a1", user_id="u1", message=f"entry {i}") for i in range(count)]
+
+
+async def test_failed_batch_is_retried(db, monkeypatch):
+    calls = flaky_insert(monkeypatch, failures=2)
+    writer = AuditWriter(100, 10, 0.01, "block")
+    await writer.start()
+    for entry in entries(3):
+        await writer.submit(entry)
+    await writer.stop()
+
+    assert calls == [3, 3, 3]
+    assert await db.audit_logs.count_documents({}) == 3
+    assert writer.stats() == {"queue_depth": 0, "dropped": 0, "failed": 0}
+
+
+async def test_retry_after_partial_write_does_not_duplicate(db):
+    writer = AuditWriter(100, 10, 0.01, "block")
+    batch = entries(3)
+    await writer._flush(batch[:2])
+
+    await writer._flush_with_retry(batch)
+
+    assert await db.audit_logs.count_documents({}) == 3
+
+
+async def test_batch_given_up_after_last_attempt(db, monkeypatch):
+    monkeypatch.setattr(writer_module, "AUDIT_RETRY_ATTEMPTS", 3)
+    calls = flaky_insert(monkeypatch, failures=3)
+    writer = AuditWriter(100, 10, 0.01, "block")
+
+    await writer._flush_with_retry(entries(2))
+
+    assert len(calls) == 3
+    assert writer.failed == 2
+    assert await db.audit_logs.count_documents({}) == 0
+
+
+async def test_full_queue_drops_by_default(db):
+    writer = AuditWriter(2, 10, 0.01, writer_module.AUDIT_OVERFLOW_POLICY)
+    # Started by hand without its task, so nothing drains the queue
+    writer._queue = asyncio.Queue(maxsize=2)
+
+    for entry in entries(5):
+        await asyncio.wait_for(writer.submit(entry), timeout=1)
+
+    assert writer.stats() == {"queue_depth": 2, "dropped": 3, "failed": 0}
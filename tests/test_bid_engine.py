@@ -0,0 +1,207 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from mongomock_motor import AsyncMongoMockClient
+
+from app.manager import bid_engine as engine_module
+from app.manager.bid_engine import BID_OUTBOX_KEY, BidEngine, _state_key
+
+pytestmark = pytest.mark.anyio
+
+AUCTION_ID = "a1"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(engine_module, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = AsyncMongoMockClient(tz_aware=True)["test"]
+    monkeypatch.setattr(engine_module, "db", database)
+    return database
+
+
+@pytest.fixture
+def engine(redis, db):
+    return BidEngine()
+
+
+async def make_hot(engine, starts_in=-60, ends_in=3600, starting_price=100.0):
+    """Load an auction's hot state directly, as warm() would."""
+    now = datetime.now(timezone.utc).timestamp()
+    await engine._load_state(
+        keys=[_state_key(AUCTION_ID)],
+        args=[repr(starting_price), now + starts_in, now + ends_in, '', '', '', 0, int(now + ends_in) + 3600]
+    )
+
+
+async def bid(engine, user_id, amount, max_amount=None):
+    document = {
+        "id": str(uuid.uuid4()),
+        "auction_id": AUCTION_ID,
+        "user_id": user_id,
+        "user_name": user_id.upper(),
+        "bid_amount": float(amount),
+        "proxy": False,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    return await engine.place_bid(AUCTION_ID, user_id, user_id.upper(), document, max_amount)
+
+
+async def outbox(redis):
+    """(user_id, bid_amount, proxy, total_bids) for each queued bid, oldest first."""
+    entries = [json.loads(entry) for entry in await redis.lrange(BID_OUTBOX_KEY, 0, -1)]
+    return [(entry["user_id"], float(entry["bid_amount"]), entry["proxy"], entry["total_bids"]) for entry in entries]
+
+
+async def test_plain_bid_accepted(engine, redis):
+    await make_hot(engine)
+
+    result = await bid(engine, "a", 110)
+
+    assert result.accepted and result.leading and result.reason is None
+    assert result.current_highest_bid == 110.0
+    assert result.total_bids == 1
+    assert [(placed["user_id"], placed["bid_amount"]) for placed in result.bids] == [("a", 110.0)]
+    assert await outbox(redis) == [("a", 110.0, False, 1)]
+
+
+async def test_bid_must_beat_starting_price_and_highest_bid(engine, redis):
+    await make_hot(engine)
+
+    result = await bid(engine, "a", 100)
+    assert not result.accepted and result.reason == "too_low" and result.min_bid == 100.0
+
+    await bid(engine, "a", 110)
+    result = await bid(engine, "b", 110)
+    assert not result.accepted and result.reason == "too_low" and result.min_bid == 110.0
+
+    assert await outbox(redis) == [("a", 110.0, False, 1)]
+    assert (await engine.current_state(AUCTION_ID))["total_bids"] == 1
+
+
+async def test_bid_after_end_closes_auction(engine, redis, db):
+    await db.auctions.insert_one({"id": AUCTION_ID, "total_bids": 0, "current_highest_bid": None})
+    await make_hot(engine, starts_in=-3600, ends_in=-1)
+
+    result = await bid(engine, "a", 110)
+
+    assert not result.accepted and result.reason == "inactive"
+    assert await outbox(redis) == []
+    # The final hot state is written through and kept, closed, until it expires
+    assert await redis.hget(_state_key(AUCTION_ID), "closed") == "1"
+    assert (await db.auctions.find_one({"id": AUCTION_ID}))["total_bids"] == 0
+
+
+async def test_closed_auction_rejects_bids_before_end_time(engine, redis, db):
+    await db.auctions.insert_one({"id": AUCTION_ID, "total_bids": 0, "current_highest_bid": None})
+    await make_hot(engine)
+    await bid(engine, "a", 110)
+
+    final = await engine.close_auction(AUCTION_ID)
+    late = await bid(engine, "late", 500)
+
+    assert final["current_highest_bidder_id"] == "a" and final["current_highest_bid"] == 110.0
+    assert not late.accepted and late.reason == "inactive"
+    assert [entry[0] for entry in await outbox(redis)] == ["a"]
+    # Closing again, or warming, cannot reopen it
+    assert await engine.close_auction(AUCTION_ID) == final
+    await engine._load_state(keys=[_state_key(AUCTION_ID)], args=["100.0", 0, 2e9, "", "", "", 0, int(2e9)])
+    assert not (await bid(engine, "late", 600)).accepted
+
+
+async def test_close_auction_without_hot_state(engine, db):
+    assert await engine.close_auction(AUCTION_ID) is None
+
+
+async def test_bid_before_start_is_inactive(engine, redis):
+    await make_hot(engine, starts_in=60)
+
+    result = await bid(engine, "a", 110)
+
+    assert not result.accepted and result.reason == "inactive"
+    assert await outbox(redis) == []
+
+
+async def test_challenger_beats_proxy(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "b", 250)
+
+    # The old leader's proxy bids up to its maximum before losing
+    assert result.accepted and result.leading and result.reason is None
+    assert result.current_highest_bid == 250.0
+    assert result.total_bids == 3
+    assert await outbox(redis) == [("a", 110.0, False, 1), ("a", 200.0, True, 2), ("b", 250.0, False, 3)]
+
+
+async def test_challenger_proxy_takes_lead_one_increment_over_maximum(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "b", 150, max_amount=300)
+
+    assert result.accepted and result.leading
+    assert result.current_highest_bid == 201.0
+    assert await outbox(redis) == [("a", 110.0, False, 1), ("a", 200.0, True, 2), ("b", 201.0, True, 3)]
+
+
+async def test_challenger_loses_to_proxy(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "b", 150)
+
+    # Recorded, but the leader's proxy answers one increment higher
+    assert result.accepted and not result.leading and result.reason == "outbid"
+    assert result.current_highest_bid == 151.0
+    assert result.current_highest_bidder_name == "A"
+    assert result.total_bids == 3
+    assert await outbox(redis) == [("a", 110.0, False, 1), ("b", 150.0, False, 2), ("a", 151.0, True, 3)]
+
+
+async def test_tie_at_leaders_maximum_goes_to_leader(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "b", 200)
+
+    assert result.accepted and not result.leading and result.reason == "outbid"
+    assert result.current_highest_bid == 200.0
+    assert result.current_highest_bidder_name == "A"
+    assert await outbox(redis) == [("a", 110.0, False, 1), ("b", 200.0, False, 2), ("a", 200.0, True, 3)]
+
+
+async def test_leader_raises_own_maximum(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "a", 110, max_amount=300)
+
+    # No new bid and no price change, only a higher maximum
+    assert result.accepted and result.leading and result.bids == []
+    assert result.current_highest_bid == 110.0
+    assert result.total_bids == 1
+    assert await outbox(redis) == [("a", 110.0, False, 1)]
+
+    result = await bid(engine, "b", 250)
+    assert result.reason == "outbid" and result.current_highest_bid == 251.0
+    assert await outbox(redis) == [("a", 110.0, False, 1), ("b", 250.0, False, 2), ("a", 251.0, True, 3)]
+
+
+async def test_leader_cannot_lower_maximum(engine, redis):
+    await make_hot(engine)
+    await bid(engine, "a", 110, max_amount=200)
+
+    result = await bid(engine, "a", 110, max_amount=150)
+
+    assert not result.accepted and result.reason == "too_low" and result.min_bid == 200.0
+    assert await outbox(redis) == [("a", 110.0, False, 1)]
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.manager import connection_manager as manager_module
+from app.manager.connection_manager import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager, _Connection
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_with = None
+        # A blocked socket never finishes a send, like a client that stopped reading
+        self._unblocked = asyncio.Event()
+        if not blocked:
+            self._unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        await self._unblocked.wait()
+        self.sent.append(orjson.loads(payload))
+
+    async def close(self, code: int):
+        self.closed_with = code
+
+
+@pytest.fixture
+def queue_size(monkeypatch):
+    monkeypatch.setattr(manager_module, "WS_QUEUE_SIZE", 3)
+    return 3
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(manager_module, "redis_client", FakeAsyncRedis(decode_responses=True))
+    return ConnectionManager()
+
+
+def queued(conn: _Connection) -> list:
+    return [(auction_id, kind, payload) for auction_id, kind, payload in conn.pending]
+
+
+async def wait_until(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_full_queue_coalesces_superseded_bid_frames(queue_size):
+    conn = _Connection(FakeWebSocket(), "u1")
+    conn.enqueue("a1", "new_bid", "bid 1")
+    conn.enqueue("a2", "new_bid", "other auction")
+    conn.enqueue("a1", "auction_started", "status")
+
+    # Full: the new a1 bid frame replaces the queued one it supersedes
+    assert conn.enqueue("a1", "bids_batch", "bid 2")
+
+    assert queued(conn) == [
+        ("a2", "new_bid", "other auction"),
+        ("a1", "auction_started", "status"),
+        ("a1", "bids_batch", "bid 2"),
+    ]
+    assert conn.behind_since is not None
+
+
+async def test_full_queue_rejects_frame_that_cannot_coalesce(queue_size):
+    conn = _Connection(FakeWebSocket(), "u1")
+    for i in range(queue_size):
+        conn.enqueue("a1", "auction_started", f"status {i}")
+
+    assert not conn.enqueue("a1", "auction_closed", "closed")
+    assert len(conn.pending) == queue_size
+
+
+async def test_client_full_for_too_long_is_rejected(queue_size, monkeypatch):
+    monkeypatch.setattr(manager_module, "WS_SLOW_CONSUMER_SECONDS", 1)
+    conn = _Connection(FakeWebSocket(), "u1")
+    conn.enqueue("a1", "new_bid", "bid 1")
+    conn.enqueue("a2", "auction_started", "status")
+    conn.enqueue("a2", "auction_started", "status")
+    # Still within the grace period, so coalescing makes room
+    assert conn.enqueue("a1", "new_bid", "bid 2")
+
+    conn.behind_since = time.monotonic() - 2
+    assert not conn.enqueue("a1", "new_bid", "bid 3")
+
+
+async def test_frames_are_held_back_during_catch_up(queue_size):
+    conn = _Connection(FakeWebSocket(), "u1")
+    conn.holding["a1"] = []
+
+    for i in range(queue_size + 2):
+        assert conn.enqueue("a1", "new_bid", f"bid {i}")
+
+    assert not conn.pending
+    assert len(conn.holding["a1"]) == queue_size + 2
+
+
+async def test_writer_sends_frames_in_order(manager):
+    websocket = FakeWebSocket()
+    conn = await manager.accept(websocket, "u1")
+
+    for i in range(3):
+        manager.send(conn, {"type": "error", "auction_id": "a1", "detail": str(i)})
+    await wait_until(lambda: len(websocket.sent) == 3)
+
+    assert [frame["detail"] for frame in websocket.sent] == ["0", "1", "2"]
+    manager.disconnect(websocket)
+
+
+async def test_slow_consumer_is_dropped(manager, queue_size):
+    websocket = FakeWebSocket(blocked=True)
+    conn = await manager.accept(websocket, "u1")
+    manager.active_connections["a1"] = {websocket: conn}
+    conn.auctions.add("a1")
+
+    # The writer is stuck on the first frame; the rest fill the queue
+    manager._send_local("a1", orjson.dumps({"type": "auction_started"}).decode())
+    await wait_until(lambda: not conn.pending)
+    for _ in range(queue_size + 1):
+        manager._send_local("a1", orjson.dumps({"type": "auction_started"}).decode())
+    await wait_until(lambda: websocket.closed_with is not None)
+
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert "a1" not in manager.active_connections
+    assert websocket not in manager._connections
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.utils import cursor_datetime, cursor_number, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([12.5, "a1"])) == [12.5, "a1"]
+
+
+@pytest.mark.parametrize("values", [[1], [1, 2], [1, {"$gt": ""}], {"a": 1}])
+def test_malformed_cursor_is_rejected(values):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(encode_cursor(values))
+    assert exc.value.status_code == 400
+
+
+def test_undecodable_cursor_is_rejected():
+    with pytest.raises(HTTPException):
+        decode_cursor("not base64 json")
+
+
+@pytest.mark.parametrize("value", [0, 12.5, None])
+def test_cursor_number_accepts_prices(value):
+    assert cursor_number(value) == value
+
+
+@pytest.mark.parametrize("value", [{"$gte": 0}, "10", True, [1]])
+def test_cursor_number_rejects_anything_else(value):
+    with pytest.raises(HTTPException):
+        cursor_number(value)
+
+
+@pytest.mark.parametrize("value", [{"$gt": 0}, 123, "yesterday"])
+def test_cursor_datetime_rejects_non_timestamps(value):
+    with pytest.raises(HTTPException):
+        cursor_datetime(value)
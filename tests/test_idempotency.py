@@ -0,0 +1,138 @@
+import asyncio
+
+import orjson
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException
+
+from app.core import idempotency as idempotency_module
+from app.core.idempotency import IdempotencyStore, fingerprint
+
+pytestmark = pytest.mark.anyio
+
+SCOPE = "bid:u1"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(idempotency_module, "redis_client", client)
+    monkeypatch.setattr(idempotency_module, "POLL_INTERVAL", 0.01)
+    return client
+
+
+@pytest.fixture
+def store(redis):
+    return IdempotencyStore()
+
+
+class Handler:
+    """Counts calls; returns ``result`` or raises ``error``, after ``delay`` seconds."""
+
+    def __init__(self, result=None, error=None, delay=0.0):
+        self.result = result if result is not None else {"accepted": True}
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class Admission:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+
+
+async def test_replay_returns_stored_response(store):
+    handler, admit = Handler({"accepted": True, "amount": 110.0}), Admission()
+    request = fingerprint("a1", '{"bid_amount":110}')
+
+    first = await store.run(SCOPE, "key-1", request, handler, admit=admit)
+    second = await store.run(SCOPE, "key-1", request, handler, admit=admit)
+
+    assert handler.calls == 1
+    assert first.body == second.body
+    assert orjson.loads(second.body) == {"accepted": True, "amount": 110.0}
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    # Only the request that ran the handler went through admission
+    assert admit.calls == 1
+
+
+async def test_key_reused_for_another_request_conflicts(store):
+    await store.run(SCOPE, "key-1", fingerprint("a1", "110"), Handler())
+
+    with pytest.raises(HTTPException) as exc:
+        await store.run(SCOPE, "key-1", fingerprint("a1", "120"), Handler())
+    assert exc.value.status_code == 422
+
+
+async def test_keys_are_scoped(store):
+    handler = Handler()
+
+    await store.run("bid:u1", "key-1", "fp", handler)
+    await store.run("bid:u2", "key-1", "fp", handler)
+
+    assert handler.calls == 2
+
+
+async def test_rejection_is_replayed(store):
+    handler = Handler(error=HTTPException(status_code=400, detail="Bid too low"))
+
+    with pytest.raises(HTTPException):
+        await store.run(SCOPE, "key-1", "fp", handler)
+    replay = await store.run(SCOPE, "key-1", "fp", handler)
+
+    assert handler.calls == 1
+    assert replay.status_code == 400
+    assert orjson.loads(replay.body) == {"detail": "Bid too low"}
+
+
+async def test_server_error_releases_key(store, redis):
+    failing = Handler(error=HTTPException(status_code=503, detail="busy"))
+    with pytest.raises(HTTPException):
+        await store.run(SCOPE, "key-1", "fp", failing)
+    assert not await redis.exists(f"idempotency:{SCOPE}:key-1")
+
+    retry = Handler()
+    response = await store.run(SCOPE, "key-1", "fp", retry)
+    assert retry.calls == 1 and response.status_code == 200
+
+
+async def test_concurrent_duplicate_waits_for_first_result(store):
+    handler = Handler(delay=0.1)
+
+    first, second = await asyncio.gather(
+        store.run(SCOPE, "key-1", "fp", handler),
+        store.run(SCOPE, "key-1", "fp", handler)
+    )
+
+    assert handler.calls == 1
+    assert first.body == second.body
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+async def test_duplicate_gives_up_while_first_is_still_running(store, monkeypatch):
+    monkeypatch.setattr(idempotency_module, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+    slow = asyncio.create_task(store.run(SCOPE, "key-1", "fp", Handler(delay=0.3)))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as exc:
+        await store.run(SCOPE, "key-1", "fp", Handler())
+    assert exc.value.status_code == 409 and exc.value.headers["Retry-After"] == "1"
+    await slow
+
+
+@pytest.mark.parametrize("key", ["", "k" * 256])
+async def test_key_length_is_checked(store, key):
+    with pytest.raises(HTTPException) as exc:
+        await store.run(SCOPE, key, "fp", Handler())
+    assert exc.value.status_code == 400
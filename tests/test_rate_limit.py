@@ -0,0 +1,41 @@
+import pytest
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import client_ip, parse_networks, parse_rate
+
+
+def make_request(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", parse_networks("10.0.0.0/8, 192.168.1.5"))
+
+
+def test_parse_rate():
+    assert parse_rate("5/10") == (5.0, 10.0)
+    assert parse_rate("0.5") == (0.5, 1.0)
+    assert parse_rate("0") is None
+    assert parse_rate("") is None
+
+
+def test_untrusted_peer_is_the_client(trusted):
+    assert client_ip(make_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_forwarded_for_read_through_trusted_proxies(trusted):
+    request = make_request("10.0.0.2", "6.6.6.6, 198.51.100.1, 192.168.1.5")
+    # The spoofable leftmost entry is ignored; the first untrusted hop wins
+    assert client_ip(request) == "198.51.100.1"
+
+
+def test_trusted_peer_without_forwarded_for(trusted):
+    assert client_ip(make_request("10.0.0.2")) == "10.0.0.2"
+
+
+def test_forwarded_for_ignored_when_no_proxies_trusted(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", [])
+    assert client_ip(make_request("10.0.0.2", "198.51.100.1")) == "10.0.0.2"
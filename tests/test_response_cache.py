@@ -0,0 +1,152 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+from starlette.requests import Request
+
+from app.core import response_cache as cache_module
+from app.core.response_cache import LISTING_GENERATION_KEY, ResponseCache, _detail_key
+from app.manager.connection_manager import event_seq_key
+
+pytestmark = pytest.mark.anyio
+
+AUCTION_ID = "a1"
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(cache_module, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def cache(redis):
+    return ResponseCache(10)
+
+
+def request(etag=None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class Builder:
+    """Counts calls and returns the current ``value``."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+async def publish(cache, redis, message):
+    """What ConnectionManager._publish does around the cache hook."""
+    async with redis.pipeline(transaction=True) as pipe:
+        cache.on_publish(pipe, AUCTION_ID, message)
+        pipe.incr(event_seq_key(AUCTION_ID))
+        await pipe.execute()
+    cache.on_event(AUCTION_ID, message)
+
+
+def bid_event(price, total_bids):
+    return {"type": "new_bid", "auction": {"current_highest_bid": price, "total_bids": total_bids}}
+
+
+async def unchanged(rows):
+    return rows
+
+
+async def test_detail_is_built_once(cache, redis):
+    build = Builder({"id": AUCTION_ID, "current_price": 100.0})
+
+    first = await cache.detail(AUCTION_ID, build)
+    second = await cache.detail(AUCTION_ID, build)
+    # Another worker with a cold local layer reads it from Redis
+    third = await ResponseCache(10).detail(AUCTION_ID, build)
+
+    assert build.calls == 1
+    assert first.body == second.body == third.body
+    assert await redis.exists(_detail_key(AUCTION_ID))
+
+
+async def test_etag_answers_not_modified(cache):
+    entry = await cache.detail(AUCTION_ID, Builder({"id": AUCTION_ID}))
+
+    assert entry.to_response(request()).status_code == 200
+    response = entry.to_response(request(entry.etag))
+    assert response.status_code == 304 and response.headers["etag"] == entry.etag
+    assert entry.to_response(request('"stale"')).status_code == 200
+
+
+async def test_event_invalidates_detail(cache, redis):
+    build = Builder({"id": AUCTION_ID, "current_price": 100.0})
+    before = await cache.detail(AUCTION_ID, build)
+
+    build.value = {"id": AUCTION_ID, "current_price": 150.0}
+    await publish(cache, redis, bid_event(150.0, 1))
+    after = await cache.detail(AUCTION_ID, build)
+
+    assert build.calls == 2
+    assert after.data["current_price"] == 150.0 and after.etag != before.etag
+    assert after.seq == 1
+
+
+async def test_detail_built_across_an_event_is_not_stored(cache, redis):
+    async def build():
+        # A bid is published while the body is being built
+        await publish(cache, redis, bid_event(150.0, 1))
+        return {"id": AUCTION_ID, "current_price": 100.0}
+
+    await cache.detail(AUCTION_ID, build)
+
+    assert not await redis.exists(_detail_key(AUCTION_ID))
+    assert cache.stats()["details"] == 0
+
+
+async def test_missing_auction_is_not_cached(cache, redis):
+    build = Builder(None)
+
+    assert await cache.detail(AUCTION_ID, build) is None
+    assert await cache.detail(AUCTION_ID, build) is None
+    assert build.calls == 2
+
+
+async def test_bid_event_patches_local_listing_without_retiring_shared_pages(cache, redis):
+    rows = [{"id": AUCTION_ID, "current_highest_bid": None, "current_price": 100.0, "total_bids": 0}]
+    build = Builder((rows, {}))
+    await cache.listing("status=ongoing&sort=newest", build, unchanged)
+
+    await publish(cache, redis, bid_event(150.0, 1))
+    entry = await cache.listing("status=ongoing&sort=newest", build, unchanged)
+
+    assert build.calls == 1
+    assert entry.data[0]["current_highest_bid"] == entry.data[0]["current_price"] == 150.0
+    assert entry.data[0]["total_bids"] == 1
+    assert await redis.get(LISTING_GENERATION_KEY) is None
+
+
+async def test_status_event_retires_listing_pages(cache, redis):
+    build = Builder(([{"id": AUCTION_ID, "status": "upcoming"}], {}))
+    await cache.listing("sort=newest", build, unchanged)
+
+    await publish(cache, redis, {"type": "auction_started"})
+    await cache.listing("sort=newest", build, unchanged)
+
+    assert build.calls == 2
+    assert await redis.get(LISTING_GENERATION_KEY) == "1"
+
+
+async def test_shared_listing_page_is_refreshed_on_read(cache, redis):
+    rows = [{"id": AUCTION_ID, "current_highest_bid": None, "total_bids": 0}]
+    build = Builder((rows, {"X-Next-Cursor": "abc"}))
+    await cache.listing("sort=newest", build, unchanged)
+
+    async def live(rows):
+        return [{**row, "current_highest_bid": 150.0, "total_bids": 1} for row in rows]
+
+    entry = await ResponseCache(10).listing("sort=newest", build, live)
+
+    assert build.calls == 1
+    assert entry.data[0]["current_highest_bid"] == 150.0
+    assert entry.headers == {"X-Next-Cursor": "abc"}